@@ -31,6 +31,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'evaluations.middleware.SurveyStateMiddleware',  # Cookie state for the public survey flow
     'django.middleware.locale.LocaleMiddleware',  # For i18n
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -77,6 +78,74 @@ DATABASES = {
 }
 
 
+# Cache
+# Question catalogs and other read-mostly survey data are cached here.
+# Use a shared backend (Redis, Memcached) when running several worker processes.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'survey-cache',
+    }
+}
+
+# Seconds a process may keep its in-memory question catalog before reloading it
+QUESTION_CATALOG_TIMEOUT = 300
+
+# Seconds a group's professor roster stays cached (assignment edits drop it earlier)
+GROUP_ROSTER_TIMEOUT = 3600
+
+# Seconds the landing page group choices stay cached (group edits drop them earlier)
+GROUP_CHOICES_TIMEOUT = 300
+
+# Seconds the admin dashboard statistics stay cached (submissions and edits drop them earlier)
+DASHBOARD_STATS_TIMEOUT = 60
+
+
+# Survey flow
+# When enabled, students evaluate all professors on one page and submit once
+SURVEY_BATCH_MODE = os.environ.get('SURVEY_BATCH_MODE', 'False') == 'True'
+
+# Never count more participants than a group's total_students
+PARTICIPATION_ENFORCE_QUOTA = os.environ.get('PARTICIPATION_ENFORCE_QUOTA', 'False') == 'True'
+
+# The anonymous survey flow keeps its state in this signed cookie, not in the session
+SURVEY_STATE_COOKIE_NAME = 'survey_state'
+SURVEY_STATE_COOKIE_AGE = 60 * 60 * 6
+
+# Path of a local SQLite journal for write-behind submissions (empty = write directly).
+# Spooled submissions are written to the database by `manage.py drain_submissions`.
+SURVEY_SUBMISSION_SPOOL = os.environ.get('SURVEY_SUBMISSION_SPOOL', '')
+
+
+# Reports
+# Where rating reports read their averages: 'rollup' (live rollup tables) or
+# 'materialized' (PostgreSQL views refreshed by `manage.py refresh_rating_views`)
+RATING_REPORT_SOURCE = os.environ.get('RATING_REPORT_SOURCE', 'rollup')
+
+# Professors need at least this many surveys to appear in the dashboard rankings
+TOP_PROFESSORS_MIN_RESPONSES = 5
+
+# Comments shown per report row before "load more", and comments per page after that
+REPORT_COMMENT_PREVIEW = 3
+REPORT_COMMENTS_PAGE_SIZE = 20
+
+# Surveys per page of the admin survey lists
+SURVEYS_PAGE_SIZE = 50
+# Professors per page of the admin professor list
+PROFESSORS_PAGE_SIZE = 50
+# Groups per page of the admin group list
+GROUPS_PAGE_SIZE = 50
+
+# Background exports, built by `manage.py run_export_jobs`
+EXPORT_STORAGE_DIR = os.environ.get('EXPORT_STORAGE_DIR', BASE_DIR / 'exports')
+# Exports built at the same time across all workers
+EXPORT_MAX_CONCURRENT_JOBS = int(os.environ.get('EXPORT_MAX_CONCURRENT_JOBS', 2))
+# Seconds after which a running export is considered dead
+EXPORT_JOB_TIMEOUT = 1800
+# Seconds a built export is handed out again while the data is unchanged
+EXPORT_ARTIFACT_MAX_AGE = 3600
+
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
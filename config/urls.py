@@ -42,6 +42,7 @@ admin_patterns = [
     
     # Surveys
     path('surveys/', admin_views.surveys_list, name='admin_surveys_list'),
+    path('surveys/extract/', admin_views.answers_extract, name='admin_answers_extract'),
     path('surveys/<int:pk>/', admin_views.survey_detail, name='admin_survey_detail'),
     path('surveys/<int:pk>/delete/', admin_views.survey_delete, name='admin_survey_delete'),
     
@@ -74,6 +75,19 @@ admin_patterns = [
     # Internship School Rating
     path('internship-school-rating/', admin_views.admin_internship_school_rating, name='admin_internship_school_rating'),
     path('internship-school-rating/export/', admin_views.admin_internship_school_rating_export, name='admin_internship_school_rating_export'),
+    
+    # Typeahead lookups
+    path('lookup/professors/', admin_views.professor_lookup, name='admin_professor_lookup'),
+    path('lookup/groups/', admin_views.group_lookup, name='admin_group_lookup'),
+    
+    # Comments
+    path('comments/search/', admin_views.comment_search, name='admin_comment_search'),
+    path('rating-comments/<str:survey_type>/<str:level>/<int:pk>/', admin_views.rating_comments, name='admin_rating_comments'),
+    
+    # Background exports
+    path('exports/<str:kind>/', admin_views.export_job_create, name='admin_export_job_create'),
+    path('exports/jobs/<int:pk>/', admin_views.export_job_status, name='admin_export_job_status'),
+    path('exports/jobs/<int:pk>/download/', admin_views.export_job_download, name='admin_export_job_download'),
 ]
 
 urlpatterns = [
@@ -1,10 +1,12 @@
 from django.contrib import admin
-from django.db.models import Avg, Count, Q
+from django.db.models import Avg, Count, F, FloatField, Q
+from django.db.models.functions import Cast
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from .models import Group, Professor, GroupProfessor, Survey, Question, Answer
 from .custom_admin import custom_admin_site
+from .search import matching_answers
 
 
 class GroupProfessorInline(admin.TabularInline):
@@ -18,7 +20,7 @@ class GroupProfessorInline(admin.TabularInline):
 class GroupAdmin(admin.ModelAdmin):
     list_display = ['group_name', 'department', 'total_students', 'participated_students', 'participation_rate']
     list_filter = ['department']
-    search_fields = ['group_name', 'department']
+    search_fields = ['group_name', 'department__name']
     inlines = [GroupProfessorInline]
     
     def participation_rate(self, obj):
@@ -49,20 +51,12 @@ class ProfessorAdmin(admin.ModelAdmin):
     surveys_count.short_description = _('Total Surveys')
     
     def average_rating(self, obj):
-        surveys = obj.surveys.all()
-        if not surveys:
-            return 'N/A'
+        # Mean of the stored per-survey averages, without reading answers
+        avg = obj.surveys.filter(rating_count__gt=0).aggregate(
+            avg=Avg(Cast('rating_sum', FloatField()) / F('rating_count'))
+        )['avg']
         
-        total = 0
-        count = 0
-        for survey in surveys:
-            avg = survey.get_average_rating()
-            if avg > 0:
-                total += avg
-                count += 1
-        
-        if count > 0:
-            avg = total / count
+        if avg is not None:
             color = 'green' if avg <= 2 else 'orange' if avg <= 3.5 else 'red'
             return format_html(
                 '<span style="color: {}; font-weight: bold;">{:.2f}</span>',
@@ -185,7 +179,7 @@ class SurveyAdmin(admin.ModelAdmin):
     list_display = ['professor', 'group', 'created_at', 'answers_count', 'average_rating_display']
     list_filter = ['created_at', 'professor', 'group']
     search_fields = ['professor__full_name', 'group__group_name']
-    readonly_fields = ['created_at']
+    readonly_fields = ['created_at', 'rating_sum', 'rating_count', 'na_count']
     date_hierarchy = 'created_at'
     inlines = [AnswerInline]
     
@@ -193,6 +187,9 @@ class SurveyAdmin(admin.ModelAdmin):
         (_('Basic Information'), {
             'fields': ('group', 'professor', 'created_at')
         }),
+        (_('Rating Summary'), {
+            'fields': ('rating_sum', 'rating_count', 'na_count')
+        }),
     )
     
     def answers_count(self, obj):
@@ -215,9 +212,16 @@ class SurveyAdmin(admin.ModelAdmin):
 class AnswerAdmin(admin.ModelAdmin):
     list_display = ['survey', 'question_preview', 'get_answer_value', 'created_at']
     list_filter = ['question__question_type', 'created_at']
-    search_fields = ['survey__professor__full_name', 'survey__group__group_name', 'text_value']
+    search_fields = ['survey__professor__full_name', 'survey__group__group_name']
     readonly_fields = ['survey', 'question', 'created_at']
     
+    def get_search_results(self, request, queryset, search_term):
+        """Match comments through the full-text index instead of an ILIKE scan"""
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term:
+            results |= queryset.filter(pk__in=matching_answers(Answer.objects.all(), search_term).values('pk'))
+        return results, may_have_duplicates
+    
     def question_preview(self, obj):
         return obj.question.text_en[:50] + '...' if len(obj.question.text_en) > 50 else obj.question.text_en
     question_preview.short_description = _('Question')
@@ -1,11 +1,23 @@
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
-from django.db.models import Avg, Count, Q
-from django.http import JsonResponse
-from datetime import datetime, timedelta
-from .models import School, Department, Group, Professor, GroupProfessor, Survey, Question, Answer, InternshipQuestion, InternshipSurvey, InternshipAnswer
+from django.db import connection
+from django.core.paginator import Paginator
+from django.db.models import F
+from django.http import FileResponse, Http404, JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from django.views.decorators.http import require_POST
+from .models import School, Department, Group, Professor, GroupProfessor, Survey, Question, Answer, InternshipQuestion, InternshipSurvey, InternshipAnswer, ExportJob
+from .dashboard import get_dashboard_stats
+from .exports import EXPORTS, XLSX_CONTENT_TYPE, export_response
+from .export_jobs import artifact_path, enqueue_export, job_status
+from .extracts import EXTRACT_FORMATS, stream_extract, submitted_between
+from .lookups import lookup_groups, lookup_professors
+from .paging import keyset_page
+from .search import SEARCH_LIMIT, search_comments
+from .reports import HIERARCHIES, annotated_professors, comment_page, professors_rating_report, internship_department_report, internship_school_report
 
 
 def is_admin(user):
@@ -44,74 +56,7 @@ def admin_logout_view(request):
 @user_passes_test(is_admin)
 def admin_dashboard(request):
     """Main admin dashboard"""
-    # Statistics
-    total_groups = Group.objects.count()
-    total_professors = Professor.objects.count()
-    total_surveys = Survey.objects.count()
-    
-    # Calculate total participation
-    groups = Group.objects.all()
-    total_students = sum(g.total_students for g in groups)
-    total_participated = sum(g.participated_students for g in groups)
-    
-    # Recent surveys (last 7 days)
-    week_ago = datetime.now() - timedelta(days=7)
-    recent_surveys = Survey.objects.filter(created_at__gte=week_ago).count()
-    
-    # Top rated professors
-    top_professors = []
-    for prof in Professor.objects.all():
-        surveys = prof.surveys.all()
-        if surveys.exists():
-            total_avg = 0
-            count = 0
-            for survey in surveys:
-                avg = survey.get_average_rating()
-                if avg > 0:
-                    total_avg += avg
-                    count += 1
-            if count > 0:
-                avg_rating = total_avg / count
-                top_professors.append({
-                    'id': prof.id,
-                    'name': prof.full_name,
-                    'school': prof.school,
-                    'rating': round(avg_rating, 2),
-                    'count': surveys.count()
-                })
-    
-    top_professors.sort(key=lambda x: x['rating'])
-    top_professors = top_professors[:5]
-    
-    # Recent activity
-    recent_activity = Survey.objects.select_related('group', 'professor').order_by('-created_at')[:10]
-    
-    # Groups with participation
-    groups_data = []
-    for group in Group.objects.all()[:5]:
-        rate = 0
-        if group.total_students > 0:
-            rate = (group.participated_students / group.total_students) * 100
-        groups_data.append({
-            'id': group.id,
-            'name': group.group_name,
-            'department': group.department,
-            'participated': group.participated_students,
-            'total': group.total_students,
-            'rate': round(rate, 1)
-        })
-    
-    context = {
-        'total_groups': total_groups,
-        'total_professors': total_professors,
-        'total_surveys': total_surveys,
-        'total_students': total_students,
-        'total_participated': total_participated,
-        'recent_surveys': recent_surveys,
-        'top_professors': top_professors,
-        'recent_activity': recent_activity,
-        'groups_data': groups_data,
-    }
+    context = get_dashboard_stats()
     
     return render(request, 'admin_custom/dashboard.html', context)
 
@@ -120,8 +65,20 @@ def admin_dashboard(request):
 @user_passes_test(is_admin)
 def groups_list(request):
     """List all groups"""
-    groups = Group.objects.all().order_by('group_name')
-    return render(request, 'admin_custom/groups_list.html', {'groups': groups})
+    groups = Group.objects.select_related('department').order_by('group_name', 'id')
+    query = request.GET.get('q', '').strip()
+    if query:
+        groups = groups.filter(group_name__icontains=query)
+    page = Paginator(groups, settings.GROUPS_PAGE_SIZE).get_page(request.GET.get('page'))
+    # Search carried over to the page links
+    query_string = request.GET.copy()
+    query_string.pop('page', None)
+    return render(request, 'admin_custom/groups_list.html', {
+        'groups': page,
+        'page_obj': page,
+        'query': query,
+        'page_query': query_string.urlencode(),
+    })
 
 
 @login_required
@@ -218,12 +175,43 @@ def group_participation(request):
     return render(request, 'admin_custom/group_participation.html', context)
 
 
+# sort parameter: annotated field
+PROFESSOR_SORTS = {
+    'name': 'full_name',
+    'school': 'school__name',
+    'surveys': 'survey_count',
+    'groups': 'group_count',
+    'rating': 'rating',
+}
+
+
 @login_required
 @user_passes_test(is_admin)
 def professors_list(request):
-    """List all professors"""
-    professors = Professor.objects.all().order_by('full_name')
-    return render(request, 'admin_custom/professors_list.html', {'professors': professors})
+    """List professors with their survey and group counts and average rating"""
+    professors = annotated_professors()
+    query = request.GET.get('q', '').strip()
+    if query:
+        professors = professors.filter(full_name__icontains=query)
+
+    sort = request.GET.get('sort', 'name')
+    if sort.lstrip('-') not in PROFESSOR_SORTS:
+        sort = 'name'
+    field = PROFESSOR_SORTS[sort.lstrip('-')]
+    order = F(field).desc(nulls_last=True) if sort.startswith('-') else F(field).asc(nulls_last=True)
+    professors = professors.order_by(order, 'full_name', 'id')
+
+    page = Paginator(professors, settings.PROFESSORS_PAGE_SIZE).get_page(request.GET.get('page'))
+    # Search and sort carried over to the page links
+    query_string = request.GET.copy()
+    query_string.pop('page', None)
+    return render(request, 'admin_custom/professors_list.html', {
+        'professors': page,
+        'page_obj': page,
+        'query': query,
+        'sort': sort,
+        'page_query': query_string.urlencode(),
+    })
 
 
 @login_required
@@ -342,9 +330,89 @@ def professor_analytics(request, pk):
 @login_required
 @user_passes_test(is_admin)
 def surveys_list(request):
-    """List all surveys"""
-    surveys = Survey.objects.select_related('group', 'professor').order_by('-created_at')
-    return render(request, 'admin_custom/surveys_list.html', {'surveys': surveys})
+    """List surveys a page at a time, newest first"""
+    surveys, filters = _filtered_surveys(request, Survey.objects.select_related('group', 'professor'))
+    context = _survey_list_context(request, surveys, filters)
+    context['schools'] = School.objects.all()
+    return render(request, 'admin_custom/surveys_list.html', context)
+
+
+def _filtered_surveys(request, surveys):
+    """Surveys narrowed by the professor, group, department and date filters of the request"""
+    filters = {}
+    try:
+        for name in ('professor', 'group', 'department'):
+            if request.GET.get(name) and (name != 'professor' or surveys.model is Survey):
+                filters[name] = int(request.GET[name])
+        for name in ('date_from', 'date_to'):
+            if request.GET.get(name):
+                filters[name] = parse_date(request.GET[name])
+                if filters[name] is None:
+                    raise ValueError(name)
+    except ValueError:
+        messages.error(request, 'Invalid survey filters.')
+        return surveys, {}
+
+    if 'professor' in filters:
+        surveys = surveys.filter(professor_id=filters['professor'])
+    if 'group' in filters:
+        surveys = surveys.filter(group_id=filters['group'])
+    if 'department' in filters:
+        surveys = surveys.filter(group__department_id=filters['department'])
+    surveys = submitted_between(surveys, '', filters.get('date_from'), filters.get('date_to'))
+    return surveys, filters
+
+
+def _survey_list_context(request, surveys, filters):
+    page = keyset_page(
+        surveys, settings.SURVEYS_PAGE_SIZE, before=request.GET.get('before'), after=request.GET.get('after')
+    )
+    # Filters carried over to the older / newer page links
+    query = request.GET.copy()
+    for name in ('before', 'after'):
+        query.pop(name, None)
+    return {
+        'surveys': page['rows'],
+        'older': page['older'],
+        'newer': page['newer'],
+        'filter_query': query.urlencode(),
+        'filters': filters,
+        'selected_professor': Professor.objects.filter(pk=filters['professor']).first() if 'professor' in filters else None,
+        'selected_group': Group.objects.filter(pk=filters['group']).first() if 'group' in filters else None,
+        'departments': Department.objects.select_related('school'),
+    }
+
+
+@login_required
+@user_passes_test(is_admin)
+def answers_extract(request):
+    """Stream all survey answers as CSV or NDJSON"""
+    if connection.vendor != 'postgresql':
+        messages.error(request, 'The answers extract requires PostgreSQL.')
+        return redirect('admin_surveys_list')
+
+    extract_format = request.GET.get('format', 'csv')
+    if extract_format not in EXTRACT_FORMATS:
+        raise Http404
+    filters = {}
+    try:
+        for name in ('date_from', 'date_to'):
+            if request.GET.get(name):
+                filters[name] = parse_date(request.GET[name])
+                if filters[name] is None:
+                    raise ValueError(name)
+        if request.GET.get('school'):
+            filters['school_id'] = int(request.GET['school'])
+    except ValueError:
+        messages.error(request, 'Invalid extract filters.')
+        return redirect('admin_surveys_list')
+
+    response = StreamingHttpResponse(
+        stream_extract(extract_format, **filters),
+        content_type=EXTRACT_FORMATS[extract_format],
+    )
+    response['Content-Disposition'] = f'attachment; filename="answers.{extract_format}"'
+    return response
 
 
 @login_required
@@ -398,9 +466,7 @@ def survey_delete(request, pk):
     survey = get_object_or_404(Survey, pk=pk)
     
     if request.method == 'POST':
-        # Delete all related answers first
-        Answer.objects.filter(survey=survey).delete()
-        # Delete the survey
+        # Answers are deleted with the survey, after it is removed from the rating rollups
         survey.delete()
         messages.success(request, 'Survey deleted successfully.')
         return redirect('admin_surveys_list')
@@ -452,25 +518,20 @@ def assignment_add(request):
         messages.success(request, f'Assignments updated for {professor.full_name}!')
         return redirect('admin_assignments_list')
     
-    # GET request
-    professors = Professor.objects.all().order_by('full_name')
-    groups = Group.objects.all().order_by('group_name')
+    # GET request: professors and further groups are picked through the lookups
+    selected_professor = None
+    groups = Group.objects.none()
     
     # Check if professor is pre-selected
     selected_professor_id = request.GET.get('professor')
-    assigned_group_ids = []
-    
-    if selected_professor_id:
-        assigned_group_ids = list(
-            GroupProfessor.objects.filter(professor_id=selected_professor_id)
-            .values_list('group_id', flat=True)
-        )
+    if selected_professor_id and selected_professor_id.isdigit():
+        selected_professor = Professor.objects.select_related('school').filter(pk=selected_professor_id).first()
+    if selected_professor:
+        groups = Group.objects.select_related('department').filter(group_professors__professor=selected_professor)
     
     return render(request, 'admin_custom/assignment_form.html', {
-        'professors': professors,
+        'selected_professor': selected_professor,
         'groups': groups,
-        'selected_professor_id': int(selected_professor_id) if selected_professor_id else None,
-        'assigned_group_ids': assigned_group_ids,
         'action': 'Manage'
     })
 
@@ -791,9 +852,10 @@ def internship_question_delete(request, pk):
 @login_required
 @user_passes_test(is_admin)
 def internship_surveys_list(request):
-    """List all internship surveys"""
-    surveys = InternshipSurvey.objects.select_related('group').order_by('-created_at')
-    return render(request, 'admin_custom/internship_surveys_list.html', {'surveys': surveys})
+    """List internship surveys a page at a time, newest first"""
+    surveys, filters = _filtered_surveys(request, InternshipSurvey.objects.select_related('group'))
+    context = _survey_list_context(request, surveys, filters)
+    return render(request, 'admin_custom/internship_surveys_list.html', context)
 
 
 @login_required
@@ -847,9 +909,7 @@ def internship_survey_delete(request, pk):
     survey = get_object_or_404(InternshipSurvey, pk=pk)
     
     if request.method == 'POST':
-        # Delete all related answers first
-        InternshipAnswer.objects.filter(internship_survey=survey).delete()
-        # Delete the survey
+        # Answers are deleted with the survey, after it is removed from the rating rollups
         survey.delete()
         messages.success(request, 'Internship survey deleted successfully.')
         return redirect('admin_internship_surveys_list')
@@ -861,72 +921,7 @@ def internship_survey_delete(request, pk):
 @user_passes_test(is_admin)
 def admin_professors_rating(request):
     """Professors rating report with detailed question averages"""
-    from django.db.models import Avg, Count
-    
-    # Get all questions ordered by their order field
-    questions = Question.objects.filter(is_active=True, question_type='rating').order_by('order')
-    text_question = Question.objects.filter(is_active=True, question_type='text').first()
-    
-    # Get all professors
-    professors = Professor.objects.all()
-    
-    professors_data = []
-    
-    for professor in professors:
-        # Get all surveys for this professor
-        surveys = Survey.objects.filter(professor=professor)
-        
-        if not surveys.exists():
-            continue
-        
-        professor_row = {
-            'professor': professor,
-            'question_averages': [],
-            'comments': []
-        }
-        
-        # Calculate average for each rating question
-        total_sum = 0
-        valid_question_count = 0
-        
-        for question in questions:
-            # Get all answers for this question and professor (excluding N/A)
-            answers = Answer.objects.filter(
-                survey__professor=professor,
-                question=question,
-                rating_value__isnull=False
-            ).exclude(rating_value=6)  # Exclude N/A
-            
-            if answers.exists():
-                avg = answers.aggregate(Avg('rating_value'))['rating_value__avg']
-                professor_row['question_averages'].append(round(avg, 2) if avg else 0)
-                total_sum += avg if avg else 0
-                valid_question_count += 1
-            else:
-                professor_row['question_averages'].append(0)
-        
-        # Calculate overall average
-        professor_row['overall_average'] = round(total_sum / valid_question_count, 2) if valid_question_count > 0 else 0
-        
-        # Get text comments (Q20)
-        if text_question:
-            comments = Answer.objects.filter(
-                survey__professor=professor,
-                question=text_question,
-                text_value__isnull=False
-            ).exclude(text_value='').values_list('text_value', flat=True)
-            professor_row['comments'] = list(comments)
-        
-        professors_data.append(professor_row)
-    
-    # Sort by overall average (ascending - lower is better since 1 is best)
-    professors_data.sort(key=lambda x: x['overall_average'])
-    
-    context = {
-        'professors_data': professors_data,
-        'questions': questions,
-        'text_question': text_question,
-    }
+    context = professors_rating_report(comment_preview=settings.REPORT_COMMENT_PREVIEW)
     
     return render(request, 'admin_custom/professors_rating.html', context)
 
@@ -935,212 +930,14 @@ def admin_professors_rating(request):
 @user_passes_test(is_admin)
 def admin_professors_rating_export(request):
     """Export professors rating to Excel"""
-    from django.db.models import Avg
-    from django.http import HttpResponse
-    from openpyxl import Workbook
-    from openpyxl.utils import get_column_letter
-    
-    # Get all questions ordered by their order field
-    questions = Question.objects.filter(is_active=True, question_type='rating').order_by('order')
-    text_question = Question.objects.filter(is_active=True, question_type='text').first()
-    
-    # Get all professors
-    professors = Professor.objects.all()
-    
-    professors_data = []
-    
-    for professor in professors:
-        # Get all surveys for this professor
-        surveys = Survey.objects.filter(professor=professor)
-        
-        if not surveys.exists():
-            continue
-        
-        professor_row = {
-            'professor': professor,
-            'question_averages': [],
-            'comments': []
-        }
-        
-        # Calculate average for each rating question
-        total_sum = 0
-        valid_question_count = 0
-        
-        for question in questions:
-            # Get all answers for this question and professor (excluding N/A)
-            answers = Answer.objects.filter(
-                survey__professor=professor,
-                question=question,
-                rating_value__isnull=False
-            ).exclude(rating_value=6)  # Exclude N/A
-            
-            if answers.exists():
-                avg = answers.aggregate(Avg('rating_value'))['rating_value__avg']
-                professor_row['question_averages'].append(round(avg, 2) if avg else 0)
-                total_sum += avg if avg else 0
-                valid_question_count += 1
-            else:
-                professor_row['question_averages'].append(0)
-        
-        # Calculate overall average
-        professor_row['overall_average'] = round(total_sum / valid_question_count, 2) if valid_question_count > 0 else 0
-        
-        # Get text comments
-        if text_question:
-            comments = Answer.objects.filter(
-                survey__professor=professor,
-                question=text_question,
-                text_value__isnull=False
-            ).exclude(text_value='').values_list('text_value', flat=True)
-            professor_row['comments'] = list(comments)
-        
-        professors_data.append(professor_row)
-    
-    # Sort by overall average (ascending - lower is better since 1 is best)
-    professors_data.sort(key=lambda x: x['overall_average'])
-    
-    # Create Excel workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Professors Rating"
-    
-    # Create header row
-    headers = ['#', 'Professor Name', 'School']
-    for q in questions:
-        headers.append(f'Q{q.order}')
-    headers.append('Average Score')
-    if text_question:
-        headers.append(f'Comments (Q{text_question.order})')
-    
-    ws.append(headers)
-    
-    # Add data rows with explicit UTF-8 handling
-    for idx, prof_data in enumerate(professors_data, start=1):
-        # Ensure all text is properly encoded as UTF-8 strings
-        row = [
-            idx,
-            str(prof_data['professor'].full_name),  # Explicit string conversion
-            str(prof_data['professor'].school.name) if prof_data['professor'].school else ''
-        ]
-        
-        # Add question averages
-        for avg in prof_data['question_averages']:
-            row.append(avg if avg > 0 else '')
-        
-        # Add overall average
-        row.append(prof_data['overall_average'])
-        
-        # Add comments (joined with newlines) - explicit UTF-8 handling
-        if text_question:
-            if prof_data['comments']:
-                # Ensure each comment is a proper UTF-8 string
-                comments_list = [str(comment) for comment in prof_data['comments']]
-                comments_text = '\n---\n'.join(comments_list)
-            else:
-                comments_text = ''
-            row.append(comments_text)
-        
-        ws.append(row)
-    
-    # Auto-adjust column widths for better readability
-    for column in ws.columns:
-        max_length = 0
-        column_letter = get_column_letter(column[0].column)
-        for cell in column:
-            try:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 100)  # Cap at 100
-        ws.column_dimensions[column_letter].width = adjusted_width
-    
-    # Prepare response with UTF-8 encoding
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet; charset=utf-8'
-    )
-    # Use encoded filename to support international characters
-    filename = 'professors_rating.xlsx'
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    response['Content-Type'] = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    
-    wb.save(response)
-    return response
+    return export_response('professors_rating')
 
 
 @login_required
 @user_passes_test(is_admin)
 def admin_internship_department_rating(request):
     """Internship department rating report with detailed question averages"""
-    from django.db.models import Avg
-    
-    # Get all internship questions ordered by their order field
-    questions = InternshipQuestion.objects.filter(is_active=True, question_type='rating').order_by('order')
-    text_question = InternshipQuestion.objects.filter(is_active=True, question_type='text').first()
-    
-    # Get all departments
-    departments = Department.objects.all().select_related('school')
-    
-    departments_data = []
-    
-    for department in departments:
-        # Get all groups for this department
-        groups = Group.objects.filter(department=department)
-        
-        # Get all internship surveys for these groups
-        surveys = InternshipSurvey.objects.filter(group__in=groups)
-        
-        if not surveys.exists():
-            continue
-        
-        department_row = {
-            'department': department,
-            'question_averages': [],
-            'comments': []
-        }
-        
-        # Calculate average for each rating question
-        total_sum = 0
-        valid_question_count = 0
-        
-        for question in questions:
-            # Get all answers for this question and department (excluding N/A)
-            answers = InternshipAnswer.objects.filter(
-                internship_survey__group__department=department,
-                question=question,
-                rating_value__isnull=False
-            ).exclude(rating_value=6)  # Exclude N/A
-            
-            if answers.exists():
-                avg = answers.aggregate(Avg('rating_value'))['rating_value__avg']
-                department_row['question_averages'].append(round(avg, 2) if avg else 0)
-                total_sum += avg if avg else 0
-                valid_question_count += 1
-            else:
-                department_row['question_averages'].append(0)
-        
-        # Calculate overall average
-        department_row['overall_average'] = round(total_sum / valid_question_count, 2) if valid_question_count > 0 else 0
-        
-        # Get text comments
-        if text_question:
-            comments = InternshipAnswer.objects.filter(
-                internship_survey__group__department=department,
-                question=text_question,
-                text_value__isnull=False
-            ).exclude(text_value='').values_list('text_value', flat=True)
-            department_row['comments'] = list(comments)
-        
-        departments_data.append(department_row)
-    
-    # Sort by overall average (ascending - lower is better since 1 is best)
-    departments_data.sort(key=lambda x: x['overall_average'])
-    
-    context = {
-        'departments_data': departments_data,
-        'questions': questions,
-        'text_question': text_question,
-    }
+    context = internship_department_report(comment_preview=settings.REPORT_COMMENT_PREVIEW)
     
     return render(request, 'admin_custom/internship_department_rating.html', context)
 
@@ -1149,215 +946,14 @@ def admin_internship_department_rating(request):
 @user_passes_test(is_admin)
 def admin_internship_department_rating_export(request):
     """Export internship department rating to Excel"""
-    from django.db.models import Avg
-    from django.http import HttpResponse
-    from openpyxl import Workbook
-    from openpyxl.utils import get_column_letter
-    
-    # Get all internship questions ordered by their order field
-    questions = InternshipQuestion.objects.filter(is_active=True, question_type='rating').order_by('order')
-    text_question = InternshipQuestion.objects.filter(is_active=True, question_type='text').first()
-    
-    # Get all departments
-    departments = Department.objects.all().select_related('school')
-    
-    departments_data = []
-    
-    for department in departments:
-        # Get all groups for this department
-        groups = Group.objects.filter(department=department)
-        
-        # Get all internship surveys for these groups
-        surveys = InternshipSurvey.objects.filter(group__in=groups)
-        
-        if not surveys.exists():
-            continue
-        
-        department_row = {
-            'department': department,
-            'question_averages': [],
-            'comments': []
-        }
-        
-        # Calculate average for each rating question
-        total_sum = 0
-        valid_question_count = 0
-        
-        for question in questions:
-            # Get all answers for this question and department (excluding N/A)
-            answers = InternshipAnswer.objects.filter(
-                internship_survey__group__department=department,
-                question=question,
-                rating_value__isnull=False
-            ).exclude(rating_value=6)  # Exclude N/A
-            
-            if answers.exists():
-                avg = answers.aggregate(Avg('rating_value'))['rating_value__avg']
-                department_row['question_averages'].append(round(avg, 2) if avg else 0)
-                total_sum += avg if avg else 0
-                valid_question_count += 1
-            else:
-                department_row['question_averages'].append(0)
-        
-        # Calculate overall average
-        department_row['overall_average'] = round(total_sum / valid_question_count, 2) if valid_question_count > 0 else 0
-        
-        # Get text comments
-        if text_question:
-            comments = InternshipAnswer.objects.filter(
-                internship_survey__group__department=department,
-                question=text_question,
-                text_value__isnull=False
-            ).exclude(text_value='').values_list('text_value', flat=True)
-            department_row['comments'] = list(comments)
-        
-        departments_data.append(department_row)
-    
-    # Sort by overall average (ascending - lower is better since 1 is best)
-    departments_data.sort(key=lambda x: x['overall_average'])
-    
-    # Create Excel workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Internship Dept Rating"
-    
-    # Create header row
-    headers = ['#', 'Department Name', 'School']
-    for q in questions:
-        headers.append(f'Q{q.order}')
-    headers.append('Average Score')
-    if text_question:
-        headers.append(f'Comments (Q{text_question.order})')
-    
-    ws.append(headers)
-    
-    # Add data rows with explicit UTF-8 handling
-    for idx, dept_data in enumerate(departments_data, start=1):
-        row = [
-            idx,
-            str(dept_data['department'].name),
-            str(dept_data['department'].school.name) if dept_data['department'].school else ''
-        ]
-        
-        # Add question averages
-        for avg in dept_data['question_averages']:
-            row.append(avg if avg > 0 else '')
-        
-        # Add overall average
-        row.append(dept_data['overall_average'])
-        
-        # Add comments (joined with newlines)
-        if text_question:
-            if dept_data['comments']:
-                comments_list = [str(comment) for comment in dept_data['comments']]
-                comments_text = '\n---\n'.join(comments_list)
-            else:
-                comments_text = ''
-            row.append(comments_text)
-        
-        ws.append(row)
-    
-    # Auto-adjust column widths
-    for column in ws.columns:
-        max_length = 0
-        column_letter = get_column_letter(column[0].column)
-        for cell in column:
-            try:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 100)
-        ws.column_dimensions[column_letter].width = adjusted_width
-    
-    # Prepare response
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet; charset=utf-8'
-    )
-    filename = 'internship_department_rating.xlsx'
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    response['Content-Type'] = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    
-    wb.save(response)
-    return response
+    return export_response('internship_department_rating')
 
 
 @login_required
 @user_passes_test(is_admin)
 def admin_internship_school_rating(request):
     """Internship school rating report with detailed question averages"""
-    from django.db.models import Avg
-    
-    # Get all internship questions ordered by their order field
-    questions = InternshipQuestion.objects.filter(is_active=True, question_type='rating').order_by('order')
-    text_question = InternshipQuestion.objects.filter(is_active=True, question_type='text').first()
-    
-    # Get all schools
-    schools = School.objects.all()
-    
-    schools_data = []
-    
-    for school in schools:
-        # Get all departments for this school
-        departments = Department.objects.filter(school=school)
-        
-        # Get all groups for these departments
-        groups = Group.objects.filter(department__in=departments)
-        
-        # Get all internship surveys for these groups
-        surveys = InternshipSurvey.objects.filter(group__in=groups)
-        
-        if not surveys.exists():
-            continue
-        
-        school_row = {
-            'school': school,
-            'question_averages': [],
-            'comments': []
-        }
-        
-        # Calculate average for each rating question
-        total_sum = 0
-        valid_question_count = 0
-        
-        for question in questions:
-            # Get all answers for this question and school (excluding N/A)
-            answers = InternshipAnswer.objects.filter(
-                internship_survey__group__department__school=school,
-                question=question,
-                rating_value__isnull=False
-            ).exclude(rating_value=6)  # Exclude N/A
-            
-            if answers.exists():
-                avg = answers.aggregate(Avg('rating_value'))['rating_value__avg']
-                school_row['question_averages'].append(round(avg, 2) if avg else 0)
-                total_sum += avg if avg else 0
-                valid_question_count += 1
-            else:
-                school_row['question_averages'].append(0)
-        
-        # Calculate overall average
-        school_row['overall_average'] = round(total_sum / valid_question_count, 2) if valid_question_count > 0 else 0
-        
-        # Get text comments
-        if text_question:
-            comments = InternshipAnswer.objects.filter(
-                internship_survey__group__department__school=school,
-                question=text_question,
-                text_value__isnull=False
-            ).exclude(text_value='').values_list('text_value', flat=True)
-            school_row['comments'] = list(comments)
-        
-        schools_data.append(school_row)
-    
-    # Sort by overall average (ascending - lower is better since 1 is best)
-    schools_data.sort(key=lambda x: x['overall_average'])
-    
-    context = {
-        'schools_data': schools_data,
-        'questions': questions,
-        'text_question': text_question,
-    }
+    context = internship_school_report(comment_preview=settings.REPORT_COMMENT_PREVIEW)
     
     return render(request, 'admin_custom/internship_school_rating.html', context)
 
@@ -1366,137 +962,95 @@ def admin_internship_school_rating(request):
 @user_passes_test(is_admin)
 def admin_internship_school_rating_export(request):
     """Export internship school rating to Excel"""
-    from django.db.models import Avg
-    from django.http import HttpResponse
-    from openpyxl import Workbook
-    from openpyxl.utils import get_column_letter
-    
-    # Get all internship questions ordered by their order field
-    questions = InternshipQuestion.objects.filter(is_active=True, question_type='rating').order_by('order')
-    text_question = InternshipQuestion.objects.filter(is_active=True, question_type='text').first()
-    
-    # Get all schools
-    schools = School.objects.all()
-    
-    schools_data = []
-    
-    for school in schools:
-        # Get all departments for this school
-        departments = Department.objects.filter(school=school)
-        
-        # Get all groups for these departments
-        groups = Group.objects.filter(department__in=departments)
-        
-        # Get all internship surveys for these groups
-        surveys = InternshipSurvey.objects.filter(group__in=groups)
-        
-        if not surveys.exists():
-            continue
-        
-        school_row = {
-            'school': school,
-            'question_averages': [],
-            'comments': []
-        }
-        
-        # Calculate average for each rating question
-        total_sum = 0
-        valid_question_count = 0
-        
-        for question in questions:
-            # Get all answers for this question and school (excluding N/A)
-            answers = InternshipAnswer.objects.filter(
-                internship_survey__group__department__school=school,
-                question=question,
-                rating_value__isnull=False
-            ).exclude(rating_value=6)  # Exclude N/A
-            
-            if answers.exists():
-                avg = answers.aggregate(Avg('rating_value'))['rating_value__avg']
-                school_row['question_averages'].append(round(avg, 2) if avg else 0)
-                total_sum += avg if avg else 0
-                valid_question_count += 1
-            else:
-                school_row['question_averages'].append(0)
-        
-        # Calculate overall average
-        school_row['overall_average'] = round(total_sum / valid_question_count, 2) if valid_question_count > 0 else 0
-        
-        # Get text comments
-        if text_question:
-            comments = InternshipAnswer.objects.filter(
-                internship_survey__group__department__school=school,
-                question=text_question,
-                text_value__isnull=False
-            ).exclude(text_value='').values_list('text_value', flat=True)
-            school_row['comments'] = list(comments)
-        
-        schools_data.append(school_row)
-    
-    # Sort by overall average (ascending - lower is better since 1 is best)
-    schools_data.sort(key=lambda x: x['overall_average'])
-    
-    # Create Excel workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Internship School Rating"
-    
-    # Create header row
-    headers = ['#', 'School Name', 'School Code']
-    for q in questions:
-        headers.append(f'Q{q.order}')
-    headers.append('Average Score')
-    if text_question:
-        headers.append(f'Comments (Q{text_question.order})')
-    
-    ws.append(headers)
-    
-    # Add data rows with explicit UTF-8 handling
-    for idx, school_data in enumerate(schools_data, start=1):
-        row = [
-            idx,
-            str(school_data['school'].name),
-            str(school_data['school'].code)
-        ]
-        
-        # Add question averages
-        for avg in school_data['question_averages']:
-            row.append(avg if avg > 0 else '')
-        
-        # Add overall average
-        row.append(school_data['overall_average'])
-        
-        # Add comments (joined with newlines)
-        if text_question:
-            if school_data['comments']:
-                comments_list = [str(comment) for comment in school_data['comments']]
-                comments_text = '\n---\n'.join(comments_list)
-            else:
-                comments_text = ''
-            row.append(comments_text)
-        
-        ws.append(row)
-    
-    # Auto-adjust column widths
-    for column in ws.columns:
-        max_length = 0
-        column_letter = get_column_letter(column[0].column)
-        for cell in column:
-            try:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 100)
-        ws.column_dimensions[column_letter].width = adjusted_width
-    
-    # Prepare response
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet; charset=utf-8'
-    )
-    filename = 'internship_school_rating.xlsx'
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    response['Content-Type'] = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    
-    wb.save(response)
-    return response
+    return export_response('internship_school_rating')
+
+
+@login_required
+@user_passes_test(is_admin)
+def rating_comments(request, survey_type, level, pk):
+    """Next page of comments of one rating report row"""
+    if survey_type not in HIERARCHIES or level not in HIERARCHIES[survey_type]['levels']:
+        raise Http404
+    try:
+        after = int(request.GET.get('after', 0))
+        limit = min(int(request.GET.get('limit', settings.REPORT_COMMENTS_PAGE_SIZE)), 100)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid page'}, status=400)
+    return JsonResponse(comment_page(survey_type, level, pk, after, max(limit, 1)))
+
+
+@login_required
+@user_passes_test(is_admin)
+def professor_lookup(request):
+    """Typeahead matches for a professor name"""
+    return JsonResponse({'results': lookup_professors(request.GET.get('q', ''))})
+
+
+@login_required
+@user_passes_test(is_admin)
+def group_lookup(request):
+    """Typeahead matches for a group name"""
+    return JsonResponse({'results': lookup_groups(request.GET.get('q', ''))})
+
+
+@login_required
+@user_passes_test(is_admin)
+def comment_search(request):
+    """Full-text search over survey and internship comments"""
+    query = request.GET.get('q', '').strip()
+    filters = {}
+    try:
+        for name in ('date_from', 'date_to'):
+            if request.GET.get(name):
+                filters[name] = parse_date(request.GET[name])
+                if filters[name] is None:
+                    raise ValueError(name)
+        for name in ('professor', 'department'):
+            if request.GET.get(name):
+                filters[f'{name}_id'] = int(request.GET[name])
+    except ValueError:
+        messages.error(request, 'Invalid search filters.')
+        filters = {}
+
+    results = search_comments(query, **filters) if query else []
+    context = {
+        'query': query,
+        'results': results,
+        'limit': SEARCH_LIMIT,
+        'selected_professor': Professor.objects.filter(pk=filters['professor_id']).first() if 'professor_id' in filters else None,
+        'departments': Department.objects.select_related('school'),
+        'selected': request.GET,
+    }
+    return render(request, 'admin_custom/comment_search.html', context)
+
+
+@login_required
+@user_passes_test(is_admin)
+@require_POST
+def export_job_create(request, kind):
+    """Queue an Excel export, or reuse one built from the current data"""
+    if kind not in EXPORTS:
+        raise Http404
+    job = enqueue_export(kind, request.user)
+    return JsonResponse(job_status(job))
+
+
+@login_required
+@user_passes_test(is_admin)
+def export_job_status(request, pk):
+    """Progress of a queued export"""
+    job = get_object_or_404(ExportJob, pk=pk)
+    return JsonResponse(job_status(job))
+
+
+@login_required
+@user_passes_test(is_admin)
+def export_job_download(request, pk):
+    """Download a finished export"""
+    job = get_object_or_404(ExportJob, pk=pk, status='done')
+    try:
+        file = open(artifact_path(job), 'rb')
+    except FileNotFoundError:
+        raise Http404
+    filename = EXPORTS[job.kind][0]
+    return FileResponse(file, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
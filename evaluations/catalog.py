@@ -0,0 +1,92 @@
+"""
+In-memory catalog of active survey questions.
+
+Active questions change a few times per term but are read on every survey page,
+so each process keeps them in memory, already localized for every language.
+The catalog version lives in Django's cache framework and is bumped whenever
+questions are saved or deleted, which makes every process rebuild its copy.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Question, InternshipQuestion
+
+
+QUESTION_MODELS = {
+    'survey': Question,
+    'internship': InternshipQuestion,
+}
+
+CATALOG_LANGUAGES = [code for code, name in settings.LANGUAGES]
+
+_catalogs = {}
+_lock = threading.Lock()
+
+
+class QuestionCatalog:
+    """Active questions of one survey type, pre-split per language"""
+
+    def __init__(self, kind, version, questions):
+        self.kind = kind
+        self.version = version
+        self.built_at = time.monotonic()
+        self.questions = questions
+        self.question_map = {question.id: question for question in questions}
+        self.localized = {
+            language: [
+                {
+                    'id': question.id,
+                    'question_type': question.question_type,
+                    'order': question.order,
+                    'get_text': question.get_text(language),
+                }
+                for question in questions
+            ]
+            for language in CATALOG_LANGUAGES
+        }
+        # Form classes built from this catalog, keyed by (form class, language)
+        self.form_classes = {}
+
+    def for_language(self, language):
+        """Localized question list as used by the survey templates"""
+        return self.localized.get(language, self.localized['en'])
+
+
+def _version_key(kind):
+    return f'question_catalog_version:{kind}'
+
+
+def get_catalog_version(kind):
+    """Current catalog version shared by all processes"""
+    key = _version_key(kind)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def get_catalog(kind):
+    """Return the active question catalog for 'survey' or 'internship'"""
+    version = get_catalog_version(kind)
+    timeout = getattr(settings, 'QUESTION_CATALOG_TIMEOUT', 300)
+    catalog = _catalogs.get(kind)
+    if catalog is not None and catalog.version == version and time.monotonic() - catalog.built_at < timeout:
+        return catalog
+
+    with _lock:
+        catalog = _catalogs.get(kind)
+        if catalog is None or catalog.version != version or time.monotonic() - catalog.built_at >= timeout:
+            questions = list(QUESTION_MODELS[kind].objects.filter(is_active=True).order_by('order', 'id'))
+            catalog = QuestionCatalog(kind, version, questions)
+            _catalogs[kind] = catalog
+    return catalog
+
+
+def invalidate_catalog(kind):
+    """Bump the catalog version once the current transaction commits"""
+    transaction.on_commit(lambda: cache.set(_version_key(kind), time.time_ns(), None))
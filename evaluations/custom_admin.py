@@ -5,6 +5,7 @@ from django.db.models import Count, Avg
 from django.utils.translation import gettext_lazy as _
 from datetime import datetime, timedelta
 from .models import Group, Professor, Survey
+from .reports import ranked_professors
 
 class CustomAdminSite(admin.AdminSite):
     site_header = _('Student Evaluation System')
@@ -27,29 +28,8 @@ class CustomAdminSite(admin.AdminSite):
         week_ago = datetime.now() - timedelta(days=7)
         recent_surveys = Survey.objects.filter(created_at__gte=week_ago).count()
         
-        # Top rated professors (average rating <= 2.5)
-        top_professors = []
-        for prof in Professor.objects.all()[:5]:
-            surveys = prof.surveys.all()
-            if surveys.exists():
-                total_avg = 0
-                count = 0
-                for survey in surveys:
-                    avg = survey.get_average_rating()
-                    if avg > 0:
-                        total_avg += avg
-                        count += 1
-                if count > 0:
-                    avg_rating = total_avg / count
-                    top_professors.append({
-                        'professor': prof,
-                        'rating': round(avg_rating, 2),
-                        'count': surveys.count()
-                    })
-        
-        # Sort by rating (lower is better)
-        top_professors.sort(key=lambda x: x['rating'])
-        top_professors = top_professors[:5]
+        # Top rated professors, ranked in the database
+        top_professors = ranked_professors()
         
         # Groups with highest participation
         top_groups = Group.objects.filter(total_students__gt=0).annotate(
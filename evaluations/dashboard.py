@@ -0,0 +1,67 @@
+"""
+Cached statistics for the admin dashboard.
+
+The statistics block of the dashboard aggregates over every group, survey and
+answer, so it is computed once and kept in Django's cache for
+DASHBOARD_STATS_TIMEOUT seconds under the report data version. That version
+is read from the database, so new submissions and admin edits, including
+those written by management commands such as drain_submissions, show up in
+every process on the next page load.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from .export_jobs import data_version
+from .models import Group, Professor, Survey
+from .reports import ranked_professors
+
+
+DASHBOARD_STATS_KEY = 'admin_dashboard_stats'
+
+
+def _compute_stats():
+    totals = Group.objects.aggregate(
+        total_groups=Count('id'),
+        total_students=Sum('total_students'),
+        total_participated=Sum('participated_students'),
+    )
+
+    groups_data = []
+    for group in Group.objects.select_related('department__school')[:5]:
+        rate = 0
+        if group.total_students > 0:
+            rate = (group.participated_students / group.total_students) * 100
+        groups_data.append({
+            'id': group.id,
+            'name': group.group_name,
+            'department': group.department,
+            'participated': group.participated_students,
+            'total': group.total_students,
+            'rate': round(rate, 1)
+        })
+
+    return {
+        'total_groups': totals['total_groups'],
+        'total_professors': Professor.objects.count(),
+        'total_surveys': Survey.objects.count(),
+        'total_students': totals['total_students'] or 0,
+        'total_participated': totals['total_participated'] or 0,
+        'recent_surveys': Survey.objects.filter(created_at__gte=timezone.now() - timedelta(days=7)).count(),
+        'top_professors': ranked_professors(),
+        'recent_activity': list(Survey.objects.select_related('group', 'professor').order_by('-created_at')[:10]),
+        'groups_data': groups_data,
+    }
+
+
+def get_dashboard_stats():
+    """Dashboard statistics, from the cache when possible"""
+    key = f'{DASHBOARD_STATS_KEY}:{data_version()}'
+    stats = cache.get(key)
+    if stats is None:
+        stats = _compute_stats()
+        cache.set(key, stats, getattr(settings, 'DASHBOARD_STATS_TIMEOUT', 60))
+    return stats
@@ -0,0 +1,162 @@
+"""
+Background export jobs.
+
+Clicking Export enqueues an ExportJob; the run_export_jobs management command
+claims pending jobs and writes the workbook into EXPORT_STORAGE_DIR, while the
+page polls the job status and downloads the finished file. Every job records
+the report data version it was requested for, and a finished artifact is
+handed out again until submissions or admin edits change that version (or it
+gets older than EXPORT_ARTIFACT_MAX_AGE). The version lives in the database,
+so changes made by management commands reach every web process. At most
+EXPORT_MAX_CONCURRENT_JOBS builds run at a time across all workers. Once a job
+finishes, the older finished and failed jobs of the same export are deleted
+with their files.
+"""
+import os
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+
+from .exports import EXPORTS, write_xlsx
+from .models import ExportJob, InternshipSurvey, ReportDataVersion, Survey
+
+
+# Serializes job claims so the concurrency cap holds across workers
+CLAIM_LOCK_ID = 7311
+
+
+def data_version():
+    """
+    Current version of the data behind the reports.
+
+    New submissions change the survey counts; edits, deletions and rollup or
+    view rebuilds bump the stored counter, so submissions never contend for
+    the counter row.
+    """
+    edits = ReportDataVersion.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+    return f'{edits}-{Survey.objects.count()}-{InternshipSurvey.objects.count()}'
+
+
+def bump_data_version():
+    """Stop reusing built exports, as part of the current transaction"""
+    if not ReportDataVersion.objects.filter(pk=1).update(version=F('version') + 1):
+        ReportDataVersion.objects.get_or_create(pk=1, defaults={'version': 1})
+
+
+def storage_dir():
+    return Path(settings.EXPORT_STORAGE_DIR)
+
+
+def artifact_path(job):
+    return storage_dir() / job.file_name
+
+
+def enqueue_export(kind, user=None):
+    """Job for an export of kind, reusing a current one when possible"""
+    version = data_version()
+    max_age = timedelta(seconds=getattr(settings, 'EXPORT_ARTIFACT_MAX_AGE', 3600))
+    job = (
+        ExportJob.objects.filter(
+            kind=kind,
+            data_version=version,
+            status__in=['pending', 'running', 'done'],
+            created_at__gte=timezone.now() - max_age,
+        )
+        .order_by('-created_at')
+        .first()
+    )
+    if job is not None and (job.status != 'done' or artifact_path(job).exists()):
+        return job
+    return ExportJob.objects.create(kind=kind, data_version=version, requested_by=user)
+
+
+def claim_next_job():
+    """Mark the oldest pending job as running, unless the concurrency cap is reached"""
+    now = timezone.now()
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s)', [CLAIM_LOCK_ID])
+
+        # Jobs of a worker that died never finish; free their slots
+        timeout = timedelta(seconds=getattr(settings, 'EXPORT_JOB_TIMEOUT', 1800))
+        ExportJob.objects.filter(status='running', started_at__lt=now - timeout).update(
+            status='failed', error='Timed out', finished_at=now
+        )
+
+        if ExportJob.objects.filter(status='running').count() >= getattr(settings, 'EXPORT_MAX_CONCURRENT_JOBS', 2):
+            return None
+
+        job = (
+            ExportJob.objects.select_for_update(skip_locked=True)
+            .filter(status='pending')
+            .order_by('created_at')
+            .first()
+        )
+        if job is not None:
+            job.status = 'running'
+            job.started_at = now
+            job.save(update_fields=['status', 'started_at'])
+        return job
+
+
+def run_job(job):
+    """Build the artifact of a claimed job"""
+    filename, title, build_rows = EXPORTS[job.kind]
+    directory = storage_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    job.file_name = f'{job.kind}-{job.pk}.xlsx'
+    temp_path = None
+    try:
+        # Write next to the final path and rename, so downloads never see a partial file
+        with tempfile.NamedTemporaryFile(dir=directory, suffix='.part', delete=False) as file:
+            temp_path = file.name
+            write_xlsx(file, title, build_rows())
+        os.replace(temp_path, artifact_path(job))
+    except Exception as exc:
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+        job.status = 'failed'
+        job.error = str(exc)
+    else:
+        job.status = 'done'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['file_name', 'status', 'error', 'finished_at'])
+    if job.status == 'done':
+        prune_jobs(job)
+    return job
+
+
+def prune_jobs(job):
+    """Delete the finished and failed jobs of the same export that job supersedes"""
+    superseded = ExportJob.objects.filter(
+        kind=job.kind, status__in=['done', 'failed'], created_at__lt=job.created_at
+    ).exclude(pk=job.pk)
+    for old_job in superseded:
+        if old_job.file_name:
+            try:
+                os.remove(artifact_path(old_job))
+            except FileNotFoundError:
+                pass
+        old_job.delete()
+
+
+def job_status(job):
+    """JSON-ready description of a job"""
+    data = {
+        'id': job.pk,
+        'kind': job.kind,
+        'status': job.status,
+        'error': job.error,
+        'status_url': reverse('admin_export_job_status', args=[job.pk]),
+        'download_url': None,
+    }
+    if job.status == 'done':
+        data['download_url'] = reverse('admin_export_job_download', args=[job.pk])
+    return data
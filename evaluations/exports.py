@@ -0,0 +1,118 @@
+"""
+Excel exports written with openpyxl's write-only mode.
+
+Rows are plain lists written to the sheet as they are produced. A write-only
+sheet needs its column widths before the first row, so they are fixed per
+header instead of measured. The workbook is saved to a temporary file and
+streamed to the client in chunks, so no rows or cell objects are kept in
+memory and no worker holds the whole file.
+"""
+import tempfile
+
+from django.http import FileResponse
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+from .reports import professors_rating_report, internship_department_report, internship_school_report
+
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+MAX_COLUMN_WIDTH = 100
+# header: column width
+COLUMN_WIDTHS = {
+    '#': 6,
+    'Professor Name': 40,
+    'Department Name': 40,
+    'School Name': 40,
+    'School': 30,
+    'School Code': 14,
+    'Average Score': 15,
+}
+
+
+def column_width(header):
+    """Fixed width of a column, chosen by its header"""
+    if header.startswith('Comments'):
+        return MAX_COLUMN_WIDTH
+    return COLUMN_WIDTHS.get(header, min(len(header) + 4, MAX_COLUMN_WIDTH))
+
+
+def write_xlsx(file, title, rows):
+    """Write rows (header first) to a one-sheet workbook in file in one pass"""
+    rows = iter(rows)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title)
+    headers = next(rows, None)
+    if headers is not None:
+        for index, header in enumerate(headers, start=1):
+            ws.column_dimensions[get_column_letter(index)].width = column_width(str(header))
+        ws.append(headers)
+    for row in rows:
+        ws.append(row)
+    wb.save(file)
+
+
+def xlsx_response(filename, title, rows):
+    """Stream a workbook built from rows as an attachment"""
+    file = tempfile.TemporaryFile()
+    write_xlsx(file, title, rows)
+    file.seek(0)
+    return FileResponse(file, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
+
+
+def rating_rows(headers, data, label_columns, text_question):
+    """Header and data rows of a rating report export"""
+    yield headers
+    for idx, row_data in enumerate(data, start=1):
+        row = [idx, *label_columns(row_data)]
+        row.extend(avg if avg > 0 else '' for avg in row_data['question_averages'])
+        row.append(row_data['overall_average'])
+        if text_question:
+            row.append('\n---\n'.join(str(comment) for comment in row_data['comments']))
+        yield row
+
+
+def _report_rows(report, data_key, label_headers, label_columns):
+    questions = report['questions']
+    text_question = report['text_question']
+    headers = list(label_headers)
+    headers.extend(f'Q{q.order}' for q in questions)
+    headers.append('Average Score')
+    if text_question:
+        headers.append(f'Comments (Q{text_question.order})')
+    return rating_rows(headers, report[data_key], label_columns, text_question)
+
+
+def professors_rating_rows():
+    return _report_rows(
+        professors_rating_report(), 'professors_data', ['#', 'Professor Name', 'School'],
+        lambda row: [row['professor'].full_name, row['professor'].school.name if row['professor'].school else ''],
+    )
+
+
+def internship_department_rows():
+    return _report_rows(
+        internship_department_report(), 'departments_data', ['#', 'Department Name', 'School'],
+        lambda row: [row['department'].name, row['department'].school.name if row['department'].school else ''],
+    )
+
+
+def internship_school_rows():
+    return _report_rows(
+        internship_school_report(), 'schools_data', ['#', 'School Name', 'School Code'],
+        lambda row: [row['school'].name, row['school'].code],
+    )
+
+
+# kind: (file name, sheet title, row builder)
+EXPORTS = {
+    'professors_rating': ('professors_rating.xlsx', 'Professors Rating', professors_rating_rows),
+    'internship_department_rating': ('internship_department_rating.xlsx', 'Internship Dept Rating', internship_department_rows),
+    'internship_school_rating': ('internship_school_rating.xlsx', 'Internship School Rating', internship_school_rows),
+}
+
+
+def export_response(kind):
+    """Build an export inside the request and stream it"""
+    filename, title, build_rows = EXPORTS[kind]
+    return xlsx_response(filename, title, build_rows())
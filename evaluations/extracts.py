@@ -0,0 +1,152 @@
+"""
+Long-format extract of every professor survey answer.
+
+One row per answer with its survey, submission time, group, department,
+school, professor, question order, rating and text. The rows are produced by
+PostgreSQL's COPY ... TO STDOUT, as CSV or as newline-delimited JSON, and are
+written out in chunks as they arrive, so memory stays flat however many
+answers there are. Rows are not sorted, to keep the first byte immediate.
+"""
+import queue
+import threading
+from datetime import datetime, time, timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+from .models import Answer
+
+
+EXTRACT_COLUMNS = ['survey_id', 'submitted_at', 'group', 'department', 'school', 'professor', 'question', 'rating', 'text']
+# format: content type
+EXTRACT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+CHUNK_SIZE = 64 * 1024
+# Chunks buffered between the database and a slow client
+MAX_PENDING_CHUNKS = 16
+
+
+class ExtractCancelled(Exception):
+    pass
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def submitted_between(answers, survey_prefix, date_from=None, date_to=None):
+    """
+    Answers of surveys submitted within inclusive days in the local time zone.
+
+    With an empty survey_prefix, answers may be surveys themselves.
+    """
+    if date_from:
+        answers = answers.filter(**{f'{survey_prefix}created_at__gte': _day_start(date_from)})
+    if date_to:
+        answers = answers.filter(**{f'{survey_prefix}created_at__lt': _day_start(date_to + timedelta(days=1))})
+    return answers
+
+
+def extract_queryset(date_from=None, date_to=None, school_id=None):
+    """Answers in the extract"""
+    answers = submitted_between(Answer.objects.order_by(), 'survey__', date_from, date_to)
+    if school_id:
+        answers = answers.filter(survey__group__department__school_id=school_id)
+    return answers.values_list(
+        'survey_id', 'survey__created_at', 'survey__group__group_name', 'survey__group__department__name',
+        'survey__group__department__school__name', 'survey__professor__full_name', 'question__order',
+        'rating_value', 'text_value',
+    )
+
+
+def copy_sql(cursor, extract_format, **filters):
+    """COPY statement writing the extract to STDOUT"""
+    sql, params = extract_queryset(**filters).query.sql_with_params()
+    # COPY takes no bind parameters, so let the driver inline them
+    select = cursor.mogrify(sql, params).decode()
+    columns = ', '.join(connection.ops.quote_name(column) for column in EXTRACT_COLUMNS)
+    if extract_format == 'ndjson':
+        # One JSON document per line; CSV with unused quote and delimiter
+        # characters leaves the JSON escaping untouched
+        return (
+            f'COPY (SELECT row_to_json(extract) FROM ({select}) AS extract ({columns})) '
+            "TO STDOUT WITH (FORMAT csv, QUOTE E'\\x01', DELIMITER E'\\x02')"
+        )
+    return f'COPY (SELECT * FROM ({select}) AS extract ({columns})) TO STDOUT WITH (FORMAT csv, HEADER)'
+
+
+def copy_extract(file, extract_format='csv', **filters):
+    """Write the extract to a binary file object"""
+    with connection.cursor() as cursor:
+        cursor.copy_expert(copy_sql(cursor, extract_format, **filters), file)
+
+
+class _ChunkWriter:
+    """File object handing COPY output to the response in chunks"""
+
+    def __init__(self, chunks, cancelled):
+        self.chunks = chunks
+        self.cancelled = cancelled
+        self.buffer = bytearray()
+
+    def write(self, data):
+        self.buffer += data
+        if len(self.buffer) >= CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.put(bytes(self.buffer))
+            self.buffer.clear()
+
+    def put(self, item):
+        while True:
+            if self.cancelled.is_set():
+                raise ExtractCancelled
+            try:
+                self.chunks.put(item, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+
+def stream_extract(extract_format='csv', **filters):
+    """Yield the extract in chunks while COPY is still running"""
+    chunks = queue.Queue(MAX_PENDING_CHUNKS)
+    cancelled = threading.Event()
+    writer = _ChunkWriter(chunks, cancelled)
+    done = object()
+    errors = []
+
+    def run():
+        # The thread copies over its own connection, so the response can be
+        # consumed after the request's connection is handed back
+        try:
+            copy_extract(writer, extract_format, **filters)
+            writer.flush()
+        except ExtractCancelled:
+            pass
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connection.close()
+            try:
+                writer.put(done)
+            except ExtractCancelled:
+                pass
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is done:
+                break
+            yield chunk
+        if errors:
+            raise errors[0]
+    finally:
+        # The client went away: stop COPY at its next write
+        cancelled.set()
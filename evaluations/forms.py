@@ -1,13 +1,47 @@
 from django import forms
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.forms.utils import ErrorDict
 from django.utils.translation import gettext_lazy as _
-from .models import Survey, Group, Question, Answer, InternshipQuestion, InternshipAnswer
+from .models import Survey, Group, Question, Answer, InternshipAnswer
+from .catalog import get_catalog
+
+
+GROUP_CHOICES_KEY = 'group_selection_choices'
+
+
+def group_choices():
+    """
+    Landing page group choices in <optgroup>s per school and department.
+
+    Built from one joined query and cached until a group, department or
+    school changes, or for GROUP_CHOICES_TIMEOUT seconds, since other worker
+    processes may not share the cache that was cleared.
+    """
+    choices = cache.get(GROUP_CHOICES_KEY)
+    if choices is None:
+        rows = Group.objects.order_by(
+            'department__school__name', 'department__name', 'group_name'
+        ).values_list('id', 'group_name', 'department__name', 'department__school__name')
+        grouped = {}
+        for group_id, group_name, department_name, school_name in rows:
+            grouped.setdefault(f'{school_name} — {department_name}', []).append((group_id, group_name))
+        choices = list(grouped.items())
+        cache.set(GROUP_CHOICES_KEY, choices, getattr(settings, 'GROUP_CHOICES_TIMEOUT', 300))
+    return [('', _('Select your group'))] + choices
+
+
+def invalidate_group_choices():
+    """Drop the cached group choices once the transaction commits"""
+    transaction.on_commit(lambda: cache.delete(GROUP_CHOICES_KEY))
 
 
 class GroupSelectionForm(forms.Form):
     """Form for selecting academic group and language"""
-    group = forms.ModelChoiceField(
-        queryset=Group.objects.all(),
-        empty_label=_('Select your group'),
+    group = forms.TypedChoiceField(
+        choices=group_choices,
+        coerce=int,
         widget=forms.Select(attrs={
             'class': 'form-select form-select-lg',
             'required': True,
@@ -34,6 +68,12 @@ class GroupSelectionForm(forms.Form):
         label=_('Preferred Language'),
         initial='en'
     )
+    
+    def clean_group(self):
+        try:
+            return Group.objects.get(pk=self.cleaned_data['group'])
+        except Group.DoesNotExist:
+            raise forms.ValidationError(_('Select a valid choice.'))
 
 
 class QuestionForm(forms.ModelForm):
@@ -52,72 +92,115 @@ class QuestionForm(forms.ModelForm):
         }
 
 
-class DynamicSurveyForm(forms.Form):
-    """Dynamic form for survey - fields created based on active questions"""
-    
-    def __init__(self, *args, language='en', **kwargs):
+RATING_REQUIRED_MESSAGE = forms.Field.default_error_messages['required']
+RATING_INVALID_MESSAGE = _('Select a valid choice.')
+NULL_CHARACTERS_MESSAGE = _('Null characters are not allowed.')
+
+
+class QuestionSurveyForm(forms.Form):
+    """
+    Base for survey forms with one field per active question.
+
+    Field classes are built once per catalog and language by
+    for_language(); validation skips the field machinery and only checks
+    that ratings are integers 1-6 and that text answers are clean strings.
+    """
+    kind = None
+    rating_choices = Answer.RATING_CHOICES
+    catalog = None
+    language = 'en'
+    question_fields = ()
+
+    def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.language = language
-        
-        # Get all active questions ordered
-        questions = Question.objects.filter(is_active=True).order_by('order')
-        
-        for question in questions:
+        self.question_map = self.catalog.question_map
+
+    @classmethod
+    def for_language(cls, language, catalog=None):
+        """Return the prebuilt form class for the current catalog and language"""
+        catalog = catalog or get_catalog(cls.kind)
+        # Kept on the catalog itself, so a rebuilt catalog never reuses
+        # classes built from an older question set
+        form_class = catalog.form_classes.get((cls, language))
+        if form_class is None:
+            form_class = cls._build_class(language, catalog)
+            catalog.form_classes[(cls, language)] = form_class
+        return form_class
+
+    @classmethod
+    def _build_class(cls, language, catalog):
+        attrs = {
+            'catalog': catalog,
+            'language': language,
+            'question_fields': tuple(
+                (f'question_{question.id}', question.question_type)
+                for question in catalog.questions
+            ),
+        }
+        rating_widget = forms.RadioSelect(attrs={'class': 'rating-radio'})
+        text_widget = forms.Textarea(attrs={
+            'class': 'form-control',
+            'rows': 4,
+            'placeholder': _('Your answer...')
+        })
+        for question in catalog.questions:
             field_name = f'question_{question.id}'
-            
             if question.question_type == 'rating':
                 # Rating question (1-6)
-                self.fields[field_name] = forms.ChoiceField(
-                    choices=Answer.RATING_CHOICES,
-                    widget=forms.RadioSelect(attrs={'class': 'rating-radio'}),
+                attrs[field_name] = forms.ChoiceField(
+                    choices=cls.rating_choices,
+                    widget=rating_widget,
                     label=question.get_text(language),
                     required=True
                 )
             else:
                 # Text question
-                self.fields[field_name] = forms.CharField(
-                    widget=forms.Textarea(attrs={
-                        'class': 'form-control',
-                        'rows': 4,
-                        'placeholder': _('Your answer...')
-                    }),
+                attrs[field_name] = forms.CharField(
+                    widget=text_widget,
                     label=question.get_text(language),
                     required=False
                 )
+        name = f'{cls.__name__}_{language}'
+        return type(cls)(name, (cls,), attrs)
 
+    def full_clean(self):
+        """Fast validation of all answers without per-field cleaning"""
+        self._errors = ErrorDict()
+        if not self.is_bound:
+            return
+        self.cleaned_data = {}
 
-class DynamicInternshipSurveyForm(forms.Form):
-    """Dynamic form for internship survey - fields created based on active internship questions"""
-    
-    def __init__(self, *args, language='en', **kwargs):
-        super().__init__(*args, **kwargs)
-        self.language = language
-        
-        # Get all active internship questions ordered
-        questions = InternshipQuestion.objects.filter(is_active=True).order_by('order')
-        
-        for question in questions:
-            field_name = f'question_{question.id}'
-            
-            if question.question_type == 'rating':
-                # Rating question (1-6)
-                self.fields[field_name] = forms.ChoiceField(
-                    choices=InternshipAnswer.RATING_CHOICES,
-                    widget=forms.RadioSelect(attrs={'class': 'rating-radio'}),
-                    label=question.get_text(language),
-                    required=True
-                )
+        for field_name, question_type in self.question_fields:
+            value = self.data.get(self.add_prefix(field_name))
+            if question_type == 'rating':
+                try:
+                    rating = int(value)
+                except (TypeError, ValueError):
+                    rating = None
+                if rating is None:
+                    self._errors[field_name] = self.error_class([RATING_REQUIRED_MESSAGE])
+                elif not 1 <= rating <= 6:
+                    self._errors[field_name] = self.error_class([RATING_INVALID_MESSAGE])
+                else:
+                    self.cleaned_data[field_name] = rating
             else:
-                # Text question
-                self.fields[field_name] = forms.CharField(
-                    widget=forms.Textarea(attrs={
-                        'class': 'form-control',
-                        'rows': 4,
-                        'placeholder': _('Your answer...')
-                    }),
-                    label=question.get_text(language),
-                    required=False
-                )
+                text = (value or '').strip()
+                if '\x00' in text:
+                    self._errors[field_name] = self.error_class([NULL_CHARACTERS_MESSAGE])
+                else:
+                    self.cleaned_data[field_name] = text
+
+
+class DynamicSurveyForm(QuestionSurveyForm):
+    """Dynamic form for survey - fields created based on active questions"""
+    kind = 'survey'
+    rating_choices = Answer.RATING_CHOICES
+
+
+class DynamicInternshipSurveyForm(QuestionSurveyForm):
+    """Dynamic form for internship survey - fields created based on active internship questions"""
+    kind = 'internship'
+    rating_choices = InternshipAnswer.RATING_CHOICES
 
 
 # Keep old forms for backward compatibility during migration
@@ -0,0 +1,47 @@
+"""
+Typeahead lookups for professors and groups.
+
+Names are matched with icontains on every word of the query, which the
+pg_trgm indexes on UPPER(full_name) and UPPER(group_name) serve, and the
+closest names by trigram similarity come first. Admin forms fetch a handful of
+matches as the user types instead of rendering every professor and group.
+"""
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import Q
+
+from .models import Group, Professor
+
+
+LOOKUP_LIMIT = 20
+
+
+def _name_matches(queryset, field, text, limit):
+    words = text.split()
+    if not words:
+        return queryset.none()
+    condition = Q()
+    for word in words:
+        condition &= Q(**{f'{field}__icontains': word})
+    return (
+        queryset.filter(condition)
+        .annotate(similarity=TrigramSimilarity(field, text))
+        .order_by('-similarity', field)[:limit]
+    )
+
+
+def lookup_professors(text, limit=LOOKUP_LIMIT):
+    """Professors whose name contains every word of text, best match first"""
+    professors = _name_matches(Professor.objects.select_related('school'), 'full_name', text, limit)
+    return [
+        {'id': professor.id, 'text': professor.full_name, 'detail': professor.school.name}
+        for professor in professors
+    ]
+
+
+def lookup_groups(text, limit=LOOKUP_LIMIT):
+    """Groups whose name contains every word of text, best match first"""
+    groups = _name_matches(Group.objects.select_related('department'), 'group_name', text, limit)
+    return [
+        {'id': group.id, 'text': group.group_name, 'detail': group.department.name}
+        for group in groups
+    ]
@@ -0,0 +1,47 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from evaluations import spool
+from evaluations.submissions import apply_spooled_submissions
+
+
+class Command(BaseCommand):
+    help = 'Flush spooled survey submissions into the database in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Submissions written per transaction')
+        parser.add_argument('--loop', action='store_true', help='Keep running and drain new submissions as they arrive')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to wait when the spool is empty (with --loop)')
+
+    def handle(self, *args, **options):
+        if not spool.spool_enabled():
+            raise CommandError('SURVEY_SUBMISSION_SPOOL is not configured.')
+
+        total = 0
+        while True:
+            entries = spool.read_batch(options['batch_size'])
+            if entries:
+                try:
+                    written = apply_spooled_submissions([payload for entry_id, payload in entries])
+                except DatabaseError as exc:
+                    if not options['loop']:
+                        raise CommandError(f'Database unavailable, {spool.pending_count()} submission(s) kept: {exc}')
+                    self.stderr.write(f'Database unavailable, retrying: {exc}')
+                    time.sleep(options['interval'])
+                    continue
+                # Only forget entries once their transaction has committed
+                spool.remove([entry_id for entry_id, payload in entries])
+                total += written
+                self.stdout.write(f'Wrote {written} of {len(entries)} spooled submission(s).')
+                continue
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Drained {total} submission(s) from {settings.SURVEY_SUBMISSION_SPOOL}.'
+        ))
@@ -0,0 +1,44 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils.dateparse import parse_date
+
+from evaluations.extracts import EXTRACT_FORMATS, copy_extract
+from evaluations.models import School
+
+
+def date_argument(value):
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(value)
+    return day
+
+
+class Command(BaseCommand):
+    help = 'Write every survey answer in long format as CSV or NDJSON, streamed from PostgreSQL COPY'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(EXTRACT_FORMATS), default='csv', help='Output format')
+        parser.add_argument('--output', help='File to write (default: standard output)')
+        parser.add_argument('--from', dest='date_from', type=date_argument, help='First submission day (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='date_to', type=date_argument, help='Last submission day (YYYY-MM-DD)')
+        parser.add_argument('--school', help='Only answers from groups of the school with this code')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('The answers extract requires PostgreSQL.')
+
+        filters = {'date_from': options['date_from'], 'date_to': options['date_to']}
+        if options['school']:
+            school = School.objects.filter(code=options['school']).first()
+            if school is None:
+                raise CommandError(f'No school with code "{options["school"]}".')
+            filters['school_id'] = school.pk
+
+        if options['output']:
+            with open(options['output'], 'wb') as file:
+                copy_extract(file, options['format'], **filters)
+            self.stderr.write(self.style.SUCCESS(f'Wrote {options["output"]}.'))
+        else:
+            copy_extract(sys.stdout.buffer, options['format'], **filters)
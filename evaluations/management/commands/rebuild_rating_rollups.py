@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from evaluations.export_jobs import bump_data_version
+from evaluations.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the professor and department rating rollups from all stored answers'
+
+    def handle(self, *args, **options):
+        professor_rows, department_rows = rebuild_rollups()
+        bump_data_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {professor_rows} professor and {department_rows} department rollup row(s).'
+        ))
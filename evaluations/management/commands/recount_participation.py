@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from evaluations.models import Group, Survey, InternshipSurvey
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute participated_students for every group from stored surveys. '
+        'Semester 2-8 students finish with one internship survey, so that count is used; '
+        'for semester 1 the most-evaluated professor of the group gives the count.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Show changes without saving them')
+
+    def handle(self, *args, **options):
+        internship_count = (
+            InternshipSurvey.objects.filter(group=OuterRef('pk'))
+            .order_by().values('group')
+            .annotate(total=Count('id')).values('total')
+        )
+        busiest_professor_count = (
+            Survey.objects.filter(group=OuterRef('pk'))
+            .order_by().values('professor')
+            .annotate(total=Count('id')).order_by('-total').values('total')[:1]
+        )
+        # One aggregate query for all groups
+        groups = Group.objects.annotate(
+            internship_count=Coalesce(Subquery(internship_count), 0),
+            survey_count=Coalesce(Subquery(busiest_professor_count), 0),
+        ).only('id', 'group_name', 'semester', 'participated_students')
+
+        changed = []
+        for group in groups:
+            participated = group.internship_count if group.semester > 1 else group.survey_count
+            if participated != group.participated_students:
+                self.stdout.write(f'{group.group_name}: {group.participated_students} -> {participated}')
+                group.participated_students = participated
+                changed.append(group)
+
+        if changed and not options['dry_run']:
+            Group.objects.bulk_update(changed, ['participated_students'], batch_size=500)
+
+        action = 'Would update' if options['dry_run'] else 'Updated'
+        self.stdout.write(self.style.SUCCESS(f'{action} {len(changed)} group(s).'))
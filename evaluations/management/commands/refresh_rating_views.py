@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from evaluations.export_jobs import bump_data_version
+from evaluations.models import ProfessorRatingView, DepartmentInternshipRatingView
+
+
+RATING_VIEWS = [ProfessorRatingView, DepartmentInternshipRatingView]
+
+
+class Command(BaseCommand):
+    help = (
+        'Refresh the rating report materialized views without blocking readers. '
+        'Run it from cron, or with --loop, when RATING_REPORT_SOURCE is "materialized".'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep refreshing the views')
+        parser.add_argument('--interval', type=float, default=300.0, help='Seconds between refreshes (with --loop)')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Materialized rating views require PostgreSQL.')
+
+        while True:
+            started = time.monotonic()
+            with connection.cursor() as cursor:
+                for model in RATING_VIEWS:
+                    cursor.execute(
+                        f'REFRESH MATERIALIZED VIEW CONCURRENTLY {connection.ops.quote_name(model._meta.db_table)}'
+                    )
+            bump_data_version()
+            self.stdout.write(self.style.SUCCESS(
+                f'Refreshed {len(RATING_VIEWS)} rating view(s) in {time.monotonic() - started:.1f}s.'
+            ))
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
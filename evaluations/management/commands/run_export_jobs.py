@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from evaluations.export_jobs import claim_next_job, run_job
+
+
+class Command(BaseCommand):
+    help = 'Build the queued rating exports requested from the admin panel'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep running and build new exports as they are queued')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds to wait when no job is pending (with --loop)')
+
+    def handle(self, *args, **options):
+        built = 0
+        while True:
+            job = claim_next_job()
+            if job is not None:
+                started = time.monotonic()
+                run_job(job)
+                if job.status == 'done':
+                    built += 1
+                    self.stdout.write(f'Built {job.file_name} in {time.monotonic() - started:.1f}s.')
+                else:
+                    self.stderr.write(f'Export job {job.pk} failed: {job.error}')
+                continue
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Built {built} export(s).'))
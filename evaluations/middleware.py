@@ -0,0 +1,75 @@
+"""
+Cookie-backed state for the anonymous survey flow.
+
+The public flow only needs a few values (group, language, position and the
+professor snapshot). Keeping them in a signed cookie instead of the database
+session means anonymous students never create or rewrite django_session rows,
+while the admin panel keeps using regular database sessions.
+"""
+from django.conf import settings
+from django.core import signing
+
+
+STATE_SALT = 'evaluations.survey_state'
+
+
+class SurveyState(dict):
+    """Survey flow state that tracks whether it needs to be written back"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.modified = False
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.modified = True
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.modified = True
+
+    def pop(self, key, *args):
+        if key in self:
+            self.modified = True
+        return super().pop(key, *args)
+
+    def clear(self):
+        if self:
+            self.modified = True
+        super().clear()
+
+
+class SurveyStateMiddleware:
+    """Load request.survey_state from a signed cookie and save it when changed"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        cookie_name = getattr(settings, 'SURVEY_STATE_COOKIE_NAME', 'survey_state')
+        max_age = getattr(settings, 'SURVEY_STATE_COOKIE_AGE', 60 * 60 * 6)
+
+        state = {}
+        value = request.COOKIES.get(cookie_name)
+        if value:
+            try:
+                state = signing.loads(value, salt=STATE_SALT, max_age=max_age)
+            except signing.BadSignature:
+                state = {}
+        request.survey_state = SurveyState(state if isinstance(state, dict) else {})
+
+        response = self.get_response(request)
+
+        if request.survey_state.modified:
+            if request.survey_state:
+                response.set_cookie(
+                    cookie_name,
+                    signing.dumps(dict(request.survey_state), salt=STATE_SALT, compress=True),
+                    max_age=max_age,
+                    secure=settings.SESSION_COOKIE_SECURE,
+                    httponly=True,
+                    samesite='Lax',
+                )
+            else:
+                response.delete_cookie(cookie_name, samesite='Lax')
+        return response
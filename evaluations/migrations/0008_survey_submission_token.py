@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluations', '0007_internshipquestion_group_semester_internshipsurvey_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='internshipsurvey',
+            name='submission_token',
+            field=models.UUIDField(blank=True, editable=False, null=True, unique=True, verbose_name='Submission Token'),
+        ),
+        migrations.AddField(
+            model_name='survey',
+            name='submission_token',
+            field=models.UUIDField(blank=True, editable=False, null=True, unique=True, verbose_name='Submission Token'),
+        ),
+    ]
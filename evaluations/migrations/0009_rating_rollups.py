@@ -0,0 +1,108 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Q, Sum
+
+
+def populate_rollups(apps, schema_editor):
+    """Build the rollups from the answers stored so far"""
+    Answer = apps.get_model('evaluations', 'Answer')
+    InternshipAnswer = apps.get_model('evaluations', 'InternshipAnswer')
+    ProfessorQuestionRollup = apps.get_model('evaluations', 'ProfessorQuestionRollup')
+    DepartmentInternshipRollup = apps.get_model('evaluations', 'DepartmentInternshipRollup')
+
+    rated = ~Q(rating_value=6)
+    histogram = {
+        'rating_sum': Sum('rating_value', filter=rated),
+        'rating_count': Count('id', filter=rated),
+        **{f'count_{value}': Count('id', filter=Q(rating_value=value)) for value in range(1, 6)},
+        'na_count': Count('id', filter=Q(rating_value=6)),
+    }
+
+    rows = (
+        Answer.objects.filter(rating_value__isnull=False).order_by()
+        .values('survey__professor_id', 'survey__group_id', 'question_id').annotate(**histogram)
+    )
+    ProfessorQuestionRollup.objects.bulk_create([
+        ProfessorQuestionRollup(
+            professor_id=row.pop('survey__professor_id'),
+            group_id=row.pop('survey__group_id'),
+            question_id=row.pop('question_id'),
+            **{field: value or 0 for field, value in row.items()}
+        )
+        for row in rows
+    ], batch_size=500)
+
+    rows = (
+        InternshipAnswer.objects.filter(rating_value__isnull=False).order_by()
+        .values('internship_survey__group__department_id', 'question_id').annotate(**histogram)
+    )
+    DepartmentInternshipRollup.objects.bulk_create([
+        DepartmentInternshipRollup(
+            department_id=row.pop('internship_survey__group__department_id'),
+            question_id=row.pop('question_id'),
+            **{field: value or 0 for field, value in row.items()}
+        )
+        for row in rows
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluations', '0008_survey_submission_token'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfessorQuestionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating_sum', models.BigIntegerField(default=0, verbose_name='Rating Sum')),
+                ('rating_count', models.IntegerField(default=0, verbose_name='Rating Count')),
+                ('count_1', models.IntegerField(default=0, verbose_name='Strongly Agree')),
+                ('count_2', models.IntegerField(default=0, verbose_name='Agree')),
+                ('count_3', models.IntegerField(default=0, verbose_name='Neither Agree nor Disagree')),
+                ('count_4', models.IntegerField(default=0, verbose_name='Disagree')),
+                ('count_5', models.IntegerField(default=0, verbose_name='Strongly Disagree')),
+                ('na_count', models.IntegerField(default=0, verbose_name='Not Applicable')),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_rollups', to='evaluations.group', verbose_name='Group')),
+                ('professor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_rollups', to='evaluations.professor', verbose_name='Professor')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_rollups', to='evaluations.question', verbose_name='Question')),
+            ],
+            options={
+                'verbose_name': 'Professor Rating Rollup',
+                'verbose_name_plural': 'Professor Rating Rollups',
+            },
+        ),
+        migrations.CreateModel(
+            name='DepartmentInternshipRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating_sum', models.BigIntegerField(default=0, verbose_name='Rating Sum')),
+                ('rating_count', models.IntegerField(default=0, verbose_name='Rating Count')),
+                ('count_1', models.IntegerField(default=0, verbose_name='Strongly Agree')),
+                ('count_2', models.IntegerField(default=0, verbose_name='Agree')),
+                ('count_3', models.IntegerField(default=0, verbose_name='Neither Agree nor Disagree')),
+                ('count_4', models.IntegerField(default=0, verbose_name='Disagree')),
+                ('count_5', models.IntegerField(default=0, verbose_name='Strongly Disagree')),
+                ('na_count', models.IntegerField(default=0, verbose_name='Not Applicable')),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='internship_rollups', to='evaluations.department', verbose_name='Department')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_rollups', to='evaluations.internshipquestion', verbose_name='Question')),
+            ],
+            options={
+                'verbose_name': 'Department Internship Rollup',
+                'verbose_name_plural': 'Department Internship Rollups',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='professorquestionrollup',
+            constraint=models.UniqueConstraint(fields=('professor', 'group', 'question'), name='unique_professor_question_rollup'),
+        ),
+        migrations.AddConstraint(
+            model_name='departmentinternshiprollup',
+            constraint=models.UniqueConstraint(fields=('department', 'question'), name='unique_department_internship_rollup'),
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
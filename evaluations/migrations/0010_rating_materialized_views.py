@@ -0,0 +1,112 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:38
+
+from django.db import migrations, models
+
+
+RATING_COLUMNS = """
+    SUM(a.rating_value) FILTER (WHERE a.rating_value <> 6) AS rating_sum,
+    COUNT(*) FILTER (WHERE a.rating_value <> 6) AS rating_count,
+    COUNT(*) FILTER (WHERE a.rating_value = 6) AS na_count,
+    now() AS refreshed_at
+"""
+
+VIEWS = [
+    ('evaluations_professor_rating_view', ['professor_id', 'question_id'], f"""
+        SELECT s.professor_id || '-' || a.question_id AS id,
+               s.professor_id, a.question_id, {RATING_COLUMNS}
+        FROM evaluations_answer a
+        JOIN evaluations_survey s ON s.id = a.survey_id
+        WHERE a.rating_value IS NOT NULL
+        GROUP BY s.professor_id, a.question_id
+    """),
+    ('evaluations_department_internship_rating_view', ['department_id', 'question_id'], f"""
+        SELECT g.department_id || '-' || a.question_id AS id,
+               g.department_id, a.question_id, {RATING_COLUMNS}
+        FROM evaluations_internshipanswer a
+        JOIN evaluations_internshipsurvey s ON s.id = a.internship_survey_id
+        JOIN evaluations_group g ON g.id = s.group_id
+        WHERE a.rating_value IS NOT NULL
+        GROUP BY g.department_id, a.question_id
+    """),
+    ('evaluations_school_internship_rating_view', ['school_id', 'question_id'], f"""
+        SELECT d.school_id || '-' || a.question_id AS id,
+               d.school_id, a.question_id, {RATING_COLUMNS}
+        FROM evaluations_internshipanswer a
+        JOIN evaluations_internshipsurvey s ON s.id = a.internship_survey_id
+        JOIN evaluations_group g ON g.id = s.group_id
+        JOIN evaluations_department d ON d.id = g.department_id
+        WHERE a.rating_value IS NOT NULL
+        GROUP BY d.school_id, a.question_id
+    """),
+]
+
+
+def create_views(apps, schema_editor):
+    """Materialized views are PostgreSQL only; other databases keep the rollup reports"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, key_columns, query in VIEWS:
+        schema_editor.execute(f'CREATE MATERIALIZED VIEW {name} AS {query}')
+        # REFRESH ... CONCURRENTLY needs a unique index
+        schema_editor.execute(f'CREATE UNIQUE INDEX {name}_id ON {name} (id)')
+        schema_editor.execute(f'CREATE INDEX {name}_key ON {name} ({", ".join(key_columns)})')
+
+
+def drop_views(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, key_columns, query in VIEWS:
+        schema_editor.execute(f'DROP MATERIALIZED VIEW IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluations', '0009_rating_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_views, drop_views),
+        migrations.CreateModel(
+            name='DepartmentInternshipRatingView',
+            fields=[
+                ('id', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('rating_sum', models.BigIntegerField(verbose_name='Rating Sum')),
+                ('rating_count', models.IntegerField(verbose_name='Rating Count')),
+                ('na_count', models.IntegerField(verbose_name='Not Applicable')),
+                ('refreshed_at', models.DateTimeField(verbose_name='Refreshed At')),
+            ],
+            options={
+                'db_table': 'evaluations_department_internship_rating_view',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ProfessorRatingView',
+            fields=[
+                ('id', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('rating_sum', models.BigIntegerField(verbose_name='Rating Sum')),
+                ('rating_count', models.IntegerField(verbose_name='Rating Count')),
+                ('na_count', models.IntegerField(verbose_name='Not Applicable')),
+                ('refreshed_at', models.DateTimeField(verbose_name='Refreshed At')),
+            ],
+            options={
+                'db_table': 'evaluations_professor_rating_view',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='SchoolInternshipRatingView',
+            fields=[
+                ('id', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('rating_sum', models.BigIntegerField(verbose_name='Rating Sum')),
+                ('rating_count', models.IntegerField(verbose_name='Rating Count')),
+                ('na_count', models.IntegerField(verbose_name='Not Applicable')),
+                ('refreshed_at', models.DateTimeField(verbose_name='Refreshed At')),
+            ],
+            options={
+                'db_table': 'evaluations_school_internship_rating_view',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:43
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_rating_summary(apps, schema_editor):
+    """Fill the summary of every stored survey from its answers"""
+    for survey_model, answer_model, survey_field in [
+        ('Survey', 'Answer', 'survey'),
+        ('InternshipSurvey', 'InternshipAnswer', 'internship_survey'),
+    ]:
+        Survey = apps.get_model('evaluations', survey_model)
+        Answer = apps.get_model('evaluations', answer_model)
+
+        def summary(aggregate):
+            return Coalesce(Subquery(
+                Answer.objects.filter(**{survey_field: OuterRef('pk')}, rating_value__isnull=False)
+                .order_by().values(survey_field)
+                .annotate(value=aggregate).values('value')
+            ), 0)
+
+        rated = ~Q(rating_value=6)
+        Survey.objects.update(
+            rating_sum=summary(Sum('rating_value', filter=rated)),
+            rating_count=summary(Count('id', filter=rated)),
+            na_count=summary(Count('id', filter=Q(rating_value=6))),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluations', '0010_rating_materialized_views'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='internshipsurvey',
+            name='na_count',
+            field=models.IntegerField(default=0, verbose_name='Not Applicable'),
+        ),
+        migrations.AddField(
+            model_name='internshipsurvey',
+            name='rating_count',
+            field=models.IntegerField(default=0, verbose_name='Rating Count'),
+        ),
+        migrations.AddField(
+            model_name='internshipsurvey',
+            name='rating_sum',
+            field=models.IntegerField(default=0, verbose_name='Rating Sum'),
+        ),
+        migrations.AddField(
+            model_name='survey',
+            name='na_count',
+            field=models.IntegerField(default=0, verbose_name='Not Applicable'),
+        ),
+        migrations.AddField(
+            model_name='survey',
+            name='rating_count',
+            field=models.IntegerField(default=0, verbose_name='Rating Count'),
+        ),
+        migrations.AddField(
+            model_name='survey',
+            name='rating_sum',
+            field=models.IntegerField(default=0, verbose_name='Rating Sum'),
+        ),
+        migrations.RunPython(backfill_rating_summary, migrations.RunPython.noop),
+    ]
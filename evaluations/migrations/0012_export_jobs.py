@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('evaluations', '0011_survey_rating_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('professors_rating', 'Professors Rating'), ('internship_department_rating', 'Internship Department Rating'), ('internship_school_rating', 'Internship School Rating')], max_length=50, verbose_name='Kind')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20, verbose_name='Status')),
+                ('data_version', models.CharField(max_length=50, verbose_name='Data Version')),
+                ('file_name', models.CharField(blank=True, max_length=255, verbose_name='File Name')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Started At')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished At')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='export_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Requested By')),
+            ],
+            options={
+                'verbose_name': 'Export Job',
+                'verbose_name_plural': 'Export Jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['kind', 'data_version', 'status'], name='export_job_lookup_idx'), models.Index(fields=['status', 'created_at'], name='export_job_queue_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:53
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluations', '0012_export_jobs'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='answer',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('text_value', config='russian'), '||', django.contrib.postgres.search.SearchVector('text_value', config='simple'), django.contrib.postgres.search.SearchConfig('russian')), condition=models.Q(('text_value__isnull', False)), name='answer_text_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='internshipanswer',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('text_value', config='russian'), '||', django.contrib.postgres.search.SearchVector('text_value', config='simple'), django.contrib.postgres.search.SearchConfig('russian')), condition=models.Q(('text_value__isnull', False)), name='intern_answer_text_search_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:54
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluations', '0013_answer_text_search'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='group',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('group_name'), name='gin_trgm_ops'), name='group_name_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='professor',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('full_name'), name='gin_trgm_ops'), name='professor_name_trgm_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluations', '0014_name_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='internshipsurvey',
+            index=models.Index(fields=['-created_at', '-id'], name='internship_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='internshipsurvey',
+            index=models.Index(fields=['group', '-created_at', '-id'], name='internship_group_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='survey',
+            index=models.Index(fields=['-created_at', '-id'], name='survey_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='survey',
+            index=models.Index(fields=['professor', '-created_at', '-id'], name='survey_professor_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='survey',
+            index=models.Index(fields=['group', '-created_at', '-id'], name='survey_group_created_idx'),
+        ),
+    ]
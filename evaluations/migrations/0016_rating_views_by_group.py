@@ -0,0 +1,83 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:07
+
+from django.db import migrations
+
+
+RATING_COLUMNS = """
+    SUM(a.rating_value) FILTER (WHERE a.rating_value <> 6) AS rating_sum,
+    COUNT(*) FILTER (WHERE a.rating_value <> 6) AS rating_count,
+    COUNT(*) FILTER (WHERE a.rating_value = 6) AS na_count,
+    now() AS refreshed_at
+"""
+
+PROFESSOR_VIEW = 'evaluations_professor_rating_view'
+SCHOOL_VIEW = 'evaluations_school_internship_rating_view'
+
+# Same rows as the professor rollups, so school, department and group totals
+# come from the view too
+PROFESSOR_GROUP_QUERY = f"""
+    SELECT s.professor_id || '-' || s.group_id || '-' || a.question_id AS id,
+           s.professor_id, s.group_id, a.question_id, {RATING_COLUMNS}
+    FROM evaluations_answer a
+    JOIN evaluations_survey s ON s.id = a.survey_id
+    WHERE a.rating_value IS NOT NULL
+    GROUP BY s.professor_id, s.group_id, a.question_id
+"""
+
+PROFESSOR_QUERY = f"""
+    SELECT s.professor_id || '-' || a.question_id AS id,
+           s.professor_id, a.question_id, {RATING_COLUMNS}
+    FROM evaluations_answer a
+    JOIN evaluations_survey s ON s.id = a.survey_id
+    WHERE a.rating_value IS NOT NULL
+    GROUP BY s.professor_id, a.question_id
+"""
+
+SCHOOL_QUERY = f"""
+    SELECT d.school_id || '-' || a.question_id AS id,
+           d.school_id, a.question_id, {RATING_COLUMNS}
+    FROM evaluations_internshipanswer a
+    JOIN evaluations_internshipsurvey s ON s.id = a.internship_survey_id
+    JOIN evaluations_group g ON g.id = s.group_id
+    JOIN evaluations_department d ON d.id = g.department_id
+    WHERE a.rating_value IS NOT NULL
+    GROUP BY d.school_id, a.question_id
+"""
+
+
+def _create_view(schema_editor, name, key_columns, query):
+    schema_editor.execute(f'CREATE MATERIALIZED VIEW {name} AS {query}')
+    # REFRESH ... CONCURRENTLY needs a unique index
+    schema_editor.execute(f'CREATE UNIQUE INDEX {name}_id ON {name} (id)')
+    schema_editor.execute(f'CREATE INDEX {name}_key ON {name} ({", ".join(key_columns)})')
+
+
+def group_views(apps, schema_editor):
+    """Split the professor view by group; internship school totals come from the department view"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP MATERIALIZED VIEW IF EXISTS {PROFESSOR_VIEW}')
+    _create_view(schema_editor, PROFESSOR_VIEW, ['professor_id', 'group_id', 'question_id'], PROFESSOR_GROUP_QUERY)
+    schema_editor.execute(f'DROP MATERIALIZED VIEW IF EXISTS {SCHOOL_VIEW}')
+
+
+def ungroup_views(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP MATERIALIZED VIEW IF EXISTS {PROFESSOR_VIEW}')
+    _create_view(schema_editor, PROFESSOR_VIEW, ['professor_id', 'question_id'], PROFESSOR_QUERY)
+    _create_view(schema_editor, SCHOOL_VIEW, ['school_id', 'question_id'], SCHOOL_QUERY)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluations', '0015_survey_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(group_views, ungroup_views),
+        migrations.DeleteModel(
+            name='SchoolInternshipRatingView',
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:23
+
+from django.db import migrations, models
+
+
+def create_version_row(apps, schema_editor):
+    apps.get_model('evaluations', 'ReportDataVersion').objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluations', '0016_rating_views_by_group'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportDataVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField(default=0, verbose_name='Version')),
+            ],
+            options={
+                'verbose_name': 'Report Data Version',
+                'verbose_name_plural': 'Report Data Versions',
+            },
+        ),
+        migrations.RunPython(create_version_row, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,25 @@
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Upper
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.translation import gettext_lazy as _
 
 
+def text_search_vector(field='text_value'):
+    """
+    Full-text vector of open-ended answers.
+
+    The 'russian' configuration stems Cyrillic words with the Russian and
+    Latin words with the English stemmer; 'simple' adds the unstemmed words,
+    so Uzbek (which has no PostgreSQL dictionary) still matches exactly.
+    The answer indexes are built on this same expression.
+    """
+    return SearchVector(field, config='russian') + SearchVector(field, config='simple')
+
+
 class School(models.Model):
     """School/Faculty model"""
     name = models.CharField(max_length=200, unique=True, verbose_name=_('School Name'))
@@ -85,6 +102,10 @@ class Group(models.Model):
         verbose_name = _('Group')
         verbose_name_plural = _('Groups')
         ordering = ['group_name']
+        indexes = [
+            # Serves icontains (UPPER(...) LIKE) lookups on the name
+            GinIndex(OpClass(Upper('group_name'), name='gin_trgm_ops'), name='group_name_trgm_idx'),
+        ]
 
     def __str__(self):
         return f"{self.group_name} - {self.department.name}"
@@ -111,6 +132,10 @@ class Professor(models.Model):
         verbose_name = _('Professor')
         verbose_name_plural = _('Professors')
         ordering = ['full_name']
+        indexes = [
+            # Serves icontains (UPPER(...) LIKE) lookups on the name
+            GinIndex(OpClass(Upper('full_name'), name='gin_trgm_ops'), name='professor_name_trgm_idx'),
+        ]
 
     def __str__(self):
         return f"{self.full_name} ({self.school.name})"
@@ -211,25 +236,40 @@ class Survey(models.Model):
         verbose_name=_('Professor')
     )
     
+    # Client-side idempotency key; retried or re-drained submissions reuse it
+    submission_token = models.UUIDField(
+        null=True,
+        blank=True,
+        unique=True,
+        editable=False,
+        verbose_name=_('Submission Token')
+    )
+    
+    # Rating summary filled when the survey is submitted (N/A only counts in na_count)
+    rating_sum = models.IntegerField(default=0, verbose_name=_('Rating Sum'))
+    rating_count = models.IntegerField(default=0, verbose_name=_('Rating Count'))
+    na_count = models.IntegerField(default=0, verbose_name=_('Not Applicable'))
+    
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Created At'))
 
     class Meta:
         verbose_name = _('Survey Session')
         verbose_name_plural = _('Survey Sessions')
         ordering = ['-created_at']
+        # Keyset pagination of the survey list, overall and per professor or group
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='survey_created_idx'),
+            models.Index(fields=['professor', '-created_at', '-id'], name='survey_professor_created_idx'),
+            models.Index(fields=['group', '-created_at', '-id'], name='survey_group_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.group.group_name} - {self.professor.full_name} - {self.created_at.strftime('%Y-%m-%d %H:%M')}"
     
     def get_average_rating(self):
-        """Calculate average rating from all rating-type answers"""
-        rating_answers = self.answers.filter(
-            question__question_type='rating'
-        ).exclude(rating_value=6)  # Exclude N/A
-        
-        if rating_answers.exists():
-            total = sum(answer.rating_value for answer in rating_answers)
-            return total / rating_answers.count()
+        """Average of the rating answers (N/A excluded) from the stored summary"""
+        if self.rating_count:
+            return self.rating_sum / self.rating_count
         return 0
 
 
@@ -282,6 +322,9 @@ class Answer(models.Model):
         verbose_name_plural = _('Survey Answers')
         unique_together = ['survey', 'question']
         ordering = ['question__order']
+        indexes = [
+            GinIndex(text_search_vector(), name='answer_text_search_idx', condition=Q(text_value__isnull=False)),
+        ]
     
     def __str__(self):
         if self.question.question_type == 'rating':
@@ -351,26 +394,36 @@ class InternshipSurvey(models.Model):
         related_name='internship_surveys',
         verbose_name=_('Group')
     )
+    submission_token = models.UUIDField(
+        null=True,
+        blank=True,
+        unique=True,
+        editable=False,
+        verbose_name=_('Submission Token')
+    )
+    # Rating summary filled when the survey is submitted (N/A only counts in na_count)
+    rating_sum = models.IntegerField(default=0, verbose_name=_('Rating Sum'))
+    rating_count = models.IntegerField(default=0, verbose_name=_('Rating Count'))
+    na_count = models.IntegerField(default=0, verbose_name=_('Not Applicable'))
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Completed At'))
     
     class Meta:
         verbose_name = _('Internship Survey')
         verbose_name_plural = _('Internship Surveys')
         ordering = ['-created_at']
+        # Keyset pagination of the internship survey list, overall and per group
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='internship_created_idx'),
+            models.Index(fields=['group', '-created_at', '-id'], name='internship_group_created_idx'),
+        ]
     
     def __str__(self):
         return f"Internship Survey - {self.group.group_name} ({self.created_at.strftime('%Y-%m-%d %H:%M')})"
     
     def get_average_rating(self):
-        """Calculate average rating for this internship survey"""
-        ratings = self.internship_answers.filter(
-            question__question_type='rating',
-            rating_value__isnull=False
-        ).exclude(rating_value=6)  # Exclude "Not Applicable"
-        
-        if ratings.exists():
-            avg = ratings.aggregate(models.Avg('rating_value'))['rating_value__avg']
-            return round(avg, 2) if avg else 0
+        """Average internship rating (N/A excluded) from the stored summary"""
+        if self.rating_count:
+            return round(self.rating_sum / self.rating_count, 2)
         return 0
 
 
@@ -421,8 +474,178 @@ class InternshipAnswer(models.Model):
         verbose_name_plural = _('Internship Answers')
         unique_together = ['internship_survey', 'question']
         ordering = ['question__order']
+        indexes = [
+            GinIndex(text_search_vector(), name='intern_answer_text_search_idx', condition=Q(text_value__isnull=False)),
+        ]
     
     def __str__(self):
         if self.question.question_type == 'rating':
             return f"{self.internship_survey} - Q{self.question.order}: {self.rating_value}"
         return f"{self.internship_survey} - Q{self.question.order}: {self.text_value[:30]}..."
+
+
+class RatingRollup(models.Model):
+    """Running rating totals; N/A answers are only counted in na_count"""
+    rating_sum = models.BigIntegerField(default=0, verbose_name=_('Rating Sum'))
+    rating_count = models.IntegerField(default=0, verbose_name=_('Rating Count'))
+    count_1 = models.IntegerField(default=0, verbose_name=_('Strongly Agree'))
+    count_2 = models.IntegerField(default=0, verbose_name=_('Agree'))
+    count_3 = models.IntegerField(default=0, verbose_name=_('Neither Agree nor Disagree'))
+    count_4 = models.IntegerField(default=0, verbose_name=_('Disagree'))
+    count_5 = models.IntegerField(default=0, verbose_name=_('Strongly Disagree'))
+    na_count = models.IntegerField(default=0, verbose_name=_('Not Applicable'))
+
+    class Meta:
+        abstract = True
+
+    @property
+    def average(self):
+        return self.rating_sum / self.rating_count if self.rating_count else 0
+
+
+class ProfessorQuestionRollup(RatingRollup):
+    """Rating totals of one professor for one question within one group"""
+    professor = models.ForeignKey(
+        Professor,
+        on_delete=models.CASCADE,
+        related_name='rating_rollups',
+        verbose_name=_('Professor')
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name='rating_rollups',
+        verbose_name=_('Group')
+    )
+    question = models.ForeignKey(
+        Question,
+        on_delete=models.CASCADE,
+        related_name='rating_rollups',
+        verbose_name=_('Question')
+    )
+
+    class Meta:
+        verbose_name = _('Professor Rating Rollup')
+        verbose_name_plural = _('Professor Rating Rollups')
+        constraints = [
+            models.UniqueConstraint(fields=['professor', 'group', 'question'], name='unique_professor_question_rollup'),
+        ]
+
+    def __str__(self):
+        return f"{self.professor.full_name} - {self.group.group_name} - Q{self.question.order}"
+
+
+class DepartmentInternshipRollup(RatingRollup):
+    """Internship rating totals of one department for one question"""
+    department = models.ForeignKey(
+        Department,
+        on_delete=models.CASCADE,
+        related_name='internship_rollups',
+        verbose_name=_('Department')
+    )
+    question = models.ForeignKey(
+        InternshipQuestion,
+        on_delete=models.CASCADE,
+        related_name='rating_rollups',
+        verbose_name=_('Question')
+    )
+
+    class Meta:
+        verbose_name = _('Department Internship Rollup')
+        verbose_name_plural = _('Department Internship Rollups')
+        constraints = [
+            models.UniqueConstraint(fields=['department', 'question'], name='unique_department_internship_rollup'),
+        ]
+
+    def __str__(self):
+        return f"{self.department.name} - Q{self.question.order}"
+
+
+class RatingView(models.Model):
+    """Row of a rating materialized view, refreshed by refresh_rating_views"""
+    id = models.CharField(primary_key=True, max_length=50)
+    rating_sum = models.BigIntegerField(verbose_name=_('Rating Sum'))
+    rating_count = models.IntegerField(verbose_name=_('Rating Count'))
+    na_count = models.IntegerField(verbose_name=_('Not Applicable'))
+    refreshed_at = models.DateTimeField(verbose_name=_('Refreshed At'))
+
+    class Meta:
+        abstract = True
+
+
+class ProfessorRatingView(RatingView):
+    """Professor × group × question rating totals (PostgreSQL materialized view)"""
+    professor = models.ForeignKey(Professor, on_delete=models.DO_NOTHING, related_name='+')
+    group = models.ForeignKey(Group, on_delete=models.DO_NOTHING, related_name='+')
+    question = models.ForeignKey(Question, on_delete=models.DO_NOTHING, related_name='+')
+
+    class Meta:
+        managed = False
+        db_table = 'evaluations_professor_rating_view'
+
+
+class DepartmentInternshipRatingView(RatingView):
+    """Department × internship question rating totals (PostgreSQL materialized view)"""
+    department = models.ForeignKey(Department, on_delete=models.DO_NOTHING, related_name='+')
+    question = models.ForeignKey(InternshipQuestion, on_delete=models.DO_NOTHING, related_name='+')
+
+    class Meta:
+        managed = False
+        db_table = 'evaluations_department_internship_rating_view'
+
+
+class ExportJob(models.Model):
+    """Report export built in the background by run_export_jobs"""
+    KIND_CHOICES = [
+        ('professors_rating', _('Professors Rating')),
+        ('internship_department_rating', _('Internship Department Rating')),
+        ('internship_school_rating', _('Internship School Rating')),
+    ]
+    STATUS_CHOICES = [
+        ('pending', _('Pending')),
+        ('running', _('Running')),
+        ('done', _('Done')),
+        ('failed', _('Failed')),
+    ]
+
+    kind = models.CharField(max_length=50, choices=KIND_CHOICES, verbose_name=_('Kind'))
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name=_('Status'))
+    # Version of the report data the artifact was requested for
+    data_version = models.CharField(max_length=50, verbose_name=_('Data Version'))
+    file_name = models.CharField(max_length=255, blank=True, verbose_name=_('File Name'))
+    error = models.TextField(blank=True, verbose_name=_('Error'))
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='export_jobs',
+        verbose_name=_('Requested By')
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Created At'))
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name=_('Started At'))
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name=_('Finished At'))
+
+    class Meta:
+        verbose_name = _('Export Job')
+        verbose_name_plural = _('Export Jobs')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['kind', 'data_version', 'status'], name='export_job_lookup_idx'),
+            models.Index(fields=['status', 'created_at'], name='export_job_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} - {self.get_status_display()} ({self.created_at.strftime('%Y-%m-%d %H:%M')})"
+
+
+class ReportDataVersion(models.Model):
+    """Single-row counter of admin edits to the data behind the reports"""
+    version = models.BigIntegerField(default=0, verbose_name=_('Version'))
+
+    class Meta:
+        verbose_name = _('Report Data Version')
+        verbose_name_plural = _('Report Data Versions')
+
+    def __str__(self):
+        return str(self.version)
@@ -0,0 +1,62 @@
+"""
+Keyset pagination over (created_at, id), newest first.
+
+A page is fetched with WHERE (created_at, id) < cursor ORDER BY created_at
+DESC, id DESC LIMIT n, which walks the (created_at, id) indexes from the
+cursor, so any page costs the same as the first one. Cursors are the
+created_at and id of the last (or, going back, the first) row of a page.
+"""
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(obj):
+    return f'{obj.created_at.isoformat()}_{obj.pk}'
+
+
+def decode_cursor(cursor):
+    """(created_at, id) of a cursor, or None if it is malformed"""
+    created_at, _, pk = (cursor or '').rpartition('_')
+    try:
+        created_at = parse_datetime(created_at)
+    except ValueError:
+        return None
+    if created_at is None or not pk.isdigit():
+        return None
+    return created_at, int(pk)
+
+
+def keyset_page(queryset, size, before=None, after=None):
+    """
+    One page of queryset, newest first.
+
+    before pages to older rows and after back to newer ones. Returns the rows
+    with the cursors of the older and newer pages (None at either end).
+    """
+    older_than = decode_cursor(before)
+    newer_than = decode_cursor(after) if older_than is None else None
+
+    if newer_than is not None:
+        created_at, pk = newer_than
+        rows = list(
+            queryset.filter(created_at__gte=created_at)
+            .exclude(Q(created_at=created_at) & Q(pk__lte=pk))
+            .order_by('created_at', 'pk')[:size + 1]
+        )
+        has_newer = len(rows) > size
+        rows = rows[:size][::-1]
+        has_older = True
+    else:
+        if older_than is not None:
+            created_at, pk = older_than
+            queryset = queryset.filter(created_at__lte=created_at).exclude(Q(created_at=created_at) & Q(pk__gte=pk))
+        rows = list(queryset.order_by('-created_at', '-pk')[:size + 1])
+        has_older = len(rows) > size
+        rows = rows[:size]
+        has_newer = older_than is not None
+
+    return {
+        'rows': rows,
+        'older': encode_cursor(rows[-1]) if rows and has_older else None,
+        'newer': encode_cursor(rows[0]) if rows and has_newer else None,
+    }
@@ -0,0 +1,338 @@
+"""
+Aggregation engine for the admin rating reports.
+
+Both survey types share one hierarchy engine. Professor surveys roll up
+school → department → group → professor, and internship surveys roll up
+school → department. rating_totals() reads the finest rollup rows
+(ProfessorQuestionRollup or DepartmentInternshipRollup) in a single query and
+sums them into every level of the hierarchy, plus the overall total.
+rating_report() turns one level into report rows and keeps the other levels
+as subtotals, so a report reads a few hundred rollup rows instead of the
+answer tables. With RATING_REPORT_SOURCE = 'materialized', the same scan reads
+a PostgreSQL materialized view with the rows of the rollup table instead, so
+all averages on a page come from one refresh, and the report shows when the
+view was refreshed; survey counts and comments are still read live. Comments
+are fetched with one more query per report; pages pass comment_preview to get
+only the first few comments of each row and their count, and load the rest
+through comment_page().
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Count, F, FloatField, OuterRef, Subquery, Sum, Value, Window
+from django.db.models.functions import Cast, Coalesce, NullIf, Rank, RowNumber
+
+from .models import (
+    School, Department, Group, Professor, GroupProfessor, Survey, Question, Answer, InternshipSurvey, InternshipQuestion, InternshipAnswer,
+    ProfessorQuestionRollup, DepartmentInternshipRollup,
+    ProfessorRatingView, DepartmentInternshipRatingView,
+)
+
+
+# survey type: models, and its levels from the top down as
+# level: (model, related objects, rollup key, survey key)
+HIERARCHIES = {
+    'professor': {
+        'questions': Question,
+        'surveys': Survey,
+        'answers': (Answer, 'survey__'),
+        'rollups': ProfessorQuestionRollup,
+        'view': ProfessorRatingView,
+        'levels': {
+            'school': (School, [], 'group__department__school_id', 'group__department__school_id'),
+            'department': (Department, ['school'], 'group__department_id', 'group__department_id'),
+            'group': (Group, ['department__school'], 'group_id', 'group_id'),
+            'professor': (Professor, ['school'], 'professor_id', 'professor_id'),
+        },
+    },
+    'internship': {
+        'questions': InternshipQuestion,
+        'surveys': InternshipSurvey,
+        'answers': (InternshipAnswer, 'internship_survey__'),
+        'rollups': DepartmentInternshipRollup,
+        'view': DepartmentInternshipRatingView,
+        'levels': {
+            'school': (School, [], 'department__school_id', 'group__department__school_id'),
+            'department': (Department, ['school'], 'department_id', 'group__department_id'),
+        },
+    },
+}
+
+
+def _average_row(question_ids, totals):
+    """Question averages, response counts and overall average for one row"""
+    averages = {
+        question_id: rating_sum / rating_count
+        for question_id, (rating_sum, rating_count) in totals.items() if rating_count
+    }
+    question_averages = []
+    response_counts = []
+    for question_id in question_ids:
+        avg = averages.get(question_id)
+        question_averages.append(round(avg, 2) if avg else 0)
+        response_counts.append(totals.get(question_id, (0, 0))[1])
+    # Overall score is the mean of the answered question averages
+    answered = [averages[question_id] for question_id in question_ids if question_id in averages]
+    overall_average = round(sum(answered) / len(answered), 2) if answered else 0
+    return question_averages, response_counts, overall_average
+
+
+def rating_totals(survey_type, question_ids, source=None):
+    """
+    Rating totals of every level of a hierarchy from one rollup scan.
+
+    source is the rollup model (default) or the hierarchy's materialized view.
+    Returns {level: {key: {question_id: (rating_sum, rating_count)}}} with
+    the overall totals under the level None.
+    """
+    hierarchy = HIERARCHIES[survey_type]
+    levels = hierarchy['levels']
+    sums = {level: defaultdict(lambda: defaultdict(lambda: [0, 0])) for level in levels}
+    overall = defaultdict(lambda: [0, 0])
+
+    rows = (
+        (source or hierarchy['rollups']).objects.filter(question_id__in=question_ids)
+        .order_by()
+        .values_list(*(rollup_key for model, related, rollup_key, survey_key in levels.values()),
+                     'question_id', 'rating_sum', 'rating_count')
+    )
+    for *keys, question_id, rating_sum, rating_count in rows:
+        # A view cell whose answers are all N/A has no rating sum
+        rating_sum = rating_sum or 0
+        for level, key in zip(levels, keys):
+            if key is not None:
+                cell = sums[level][key][question_id]
+                cell[0] += rating_sum
+                cell[1] += rating_count
+        overall[question_id][0] += rating_sum
+        overall[question_id][1] += rating_count
+
+    totals = {
+        level: {key: {question_id: tuple(cell) for question_id, cell in cells.items()} for key, cells in by_key.items()}
+        for level, by_key in sums.items()
+    }
+    totals[None] = {question_id: tuple(cell) for question_id, cell in overall.items()}
+    return totals
+
+
+def _comments(answers, key_field, preview=None):
+    """
+    {key: [comment, ...]} of non-empty text answers and {key: (count, last answer id)}.
+
+    With preview, only the first preview comments of each key are fetched.
+    """
+    answers = answers.filter(text_value__isnull=False).exclude(text_value='').order_by()
+    comments = defaultdict(list)
+    last_ids = {}
+    if preview is None:
+        rows = answers.order_by(key_field, 'id').values_list(key_field, 'id', 'text_value')
+    else:
+        rows = (
+            answers.annotate(position=Window(RowNumber(), partition_by=F(key_field), order_by=F('id').asc()))
+            .filter(position__lte=preview)
+            .order_by(key_field, 'id')
+            .values_list(key_field, 'id', 'text_value')
+        )
+    for key, answer_id, text in rows:
+        comments[key].append(text)
+        last_ids[key] = answer_id
+
+    if preview is None:
+        counts = {key: len(texts) for key, texts in comments.items()}
+    else:
+        counts = dict(answers.values_list(key_field).annotate(total=Count('id')).values_list(key_field, 'total'))
+    return comments, {key: (count, last_ids.get(key)) for key, count in counts.items()}
+
+
+def comment_page(survey_type, level, key, after=0, limit=20):
+    """Comments of one report row with an answer id above after, oldest first"""
+    hierarchy = HIERARCHIES[survey_type]
+    text_question = hierarchy['questions'].objects.filter(is_active=True, question_type='text').first()
+    if text_question is None:
+        return {'comments': [], 'next_after': None}
+
+    answer_model, survey_prefix = hierarchy['answers']
+    survey_key = hierarchy['levels'][level][3]
+    rows = list(
+        answer_model.objects.filter(question=text_question, id__gt=after, **{survey_prefix + survey_key: key})
+        .filter(text_value__isnull=False)
+        .exclude(text_value='')
+        .order_by('id')
+        .values('id', 'text_value')[:limit + 1]
+    )
+    page = rows[:limit]
+    return {
+        'comments': [{'id': row['id'], 'text': row['text_value']} for row in page],
+        'next_after': page[-1]['id'] if len(rows) > limit else None,
+    }
+
+
+def _level_rows(survey_type, level, question_ids, totals, comments=None, comment_counts=None):
+    """Report rows of the objects of a level that have surveys, best (lowest) average first"""
+    hierarchy = HIERARCHIES[survey_type]
+    model, related, rollup_key, survey_key = hierarchy['levels'][level]
+    survey_counts = dict(
+        hierarchy['surveys'].objects.order_by()
+        .values_list(survey_key)
+        .annotate(total=Count('id'))
+        .values_list(survey_key, 'total')
+    )
+    objects = model.objects.select_related(*related).filter(pk__in=survey_counts)
+
+    rows = []
+    for obj in objects:
+        question_averages, response_counts, overall_average = _average_row(question_ids, totals.get(obj.id, {}))
+        comment_count, comments_after = (comment_counts or {}).get(obj.id, (0, None))
+        rows.append({
+            level: obj,
+            'question_averages': question_averages,
+            'response_counts': response_counts,
+            'overall_average': overall_average,
+            'survey_count': survey_counts[obj.id],
+            'comments': comments.get(obj.id, []) if comments is not None else [],
+            'comment_count': comment_count,
+            'comments_after': comments_after,
+        })
+    # Sort by overall average (ascending - lower is better since 1 is best)
+    rows.sort(key=lambda row: row['overall_average'])
+    return rows
+
+
+def rating_report(survey_type, level, subtotals=(), comment_preview=None):
+    """
+    Rating report of one level of a survey hierarchy.
+
+    The rows of level come with their comments (only the first
+    comment_preview of them when given, with comment_count and the
+    comments_after id to page on from); each level in subtotals gets its own
+    rows from the same rollup (or materialized view) scan, and overall holds
+    the totals of all surveys.
+    """
+    hierarchy = HIERARCHIES[survey_type]
+    question_model = hierarchy['questions']
+    questions = list(question_model.objects.filter(is_active=True, question_type='rating').order_by('order'))
+    text_question = question_model.objects.filter(is_active=True, question_type='text').first()
+    question_ids = [question.id for question in questions]
+
+    source = refreshed_at = None
+    if getattr(settings, 'RATING_REPORT_SOURCE', 'rollup') == 'materialized':
+        source = hierarchy['view']
+        refreshed_at = source.objects.values_list('refreshed_at', flat=True).first()
+    totals = rating_totals(survey_type, question_ids, source)
+
+    comments, comment_counts = {}, {}
+    if text_question:
+        answer_model, survey_prefix = hierarchy['answers']
+        survey_key = hierarchy['levels'][level][3]
+        comments, comment_counts = _comments(
+            answer_model.objects.filter(question=text_question), survey_prefix + survey_key, comment_preview
+        )
+
+    question_averages, response_counts, overall_average = _average_row(question_ids, totals[None])
+    return {
+        'rows': _level_rows(survey_type, level, question_ids, totals[level], comments, comment_counts),
+        'subtotals': {
+            subtotal_level: _level_rows(survey_type, subtotal_level, question_ids, totals[subtotal_level])
+            for subtotal_level in subtotals
+        },
+        'overall': {
+            'question_averages': question_averages,
+            'response_counts': response_counts,
+            'overall_average': overall_average,
+        },
+        'questions': questions,
+        'text_question': text_question,
+        'refreshed_at': refreshed_at,
+    }
+
+
+def _named_report(report, data_key):
+    report[data_key] = report.pop('rows')
+    return report
+
+
+def professors_rating_report(comment_preview=None):
+    """Rows of the professors rating report with school and department subtotals"""
+    report = rating_report('professor', 'professor', subtotals=['school', 'department'], comment_preview=comment_preview)
+    return _named_report(report, 'professors_data')
+
+
+def internship_department_report(comment_preview=None):
+    """Rows of the internship department rating report, best average first"""
+    return _named_report(rating_report('internship', 'department', comment_preview=comment_preview), 'departments_data')
+
+
+def internship_school_report(comment_preview=None):
+    """Rows of the internship school rating report, best average first"""
+    return _named_report(rating_report('internship', 'school', comment_preview=comment_preview), 'schools_data')
+
+
+def ranked_professors(limit=5, bottom=False, min_responses=None):
+    """
+    Best (or with bottom=True worst) rated professors, ranked in one query.
+
+    The rating is the average of all rated answers (N/A excluded) from the
+    rollups. Professors with fewer than min_responses surveys (default
+    TOP_PROFESSORS_MIN_RESPONSES) are left out, and school_rank is the rank
+    of each professor within their school.
+    """
+    if min_responses is None:
+        min_responses = getattr(settings, 'TOP_PROFESSORS_MIN_RESPONSES', 1)
+
+    survey_count = (
+        Survey.objects.filter(professor=OuterRef('pk'))
+        .order_by().values('professor')
+        .annotate(total=Count('id')).values('total')
+    )
+    professor_rating = (
+        ProfessorQuestionRollup.objects.filter(professor=OuterRef('pk'))
+        .order_by().values('professor')
+        .annotate(rating=Cast(Sum('rating_sum'), FloatField()) / NullIf(Sum('rating_count'), 0))
+        .values('rating')
+    )
+    professors = (
+        Professor.objects.annotate(
+            rating=Subquery(professor_rating, output_field=FloatField()),
+            survey_count=Subquery(survey_count),
+        )
+        .filter(rating__isnull=False, survey_count__gte=min_responses)
+        .annotate(school_rank=Window(
+            Rank(),
+            partition_by=F('school_id'),
+            order_by=F('rating').desc() if bottom else F('rating').asc(),
+        ))
+        .select_related('school')
+        .order_by('-rating' if bottom else 'rating', 'full_name')[:limit]
+    )
+    return [
+        {
+            'id': professor.id,
+            'name': professor.full_name,
+            'school': professor.school,
+            'rating': round(professor.rating, 2),
+            'count': professor.survey_count,
+            'school_rank': professor.school_rank,
+        }
+        for professor in professors
+    ]
+
+
+def annotated_professors():
+    """
+    Professors with survey_count, group_count and rating in one query.
+
+    rating is the average of all rated answers from the stored survey
+    summaries (None without any); counts come from correlated subqueries so
+    surveys and assignments do not multiply each other's rows.
+    """
+    surveys = Survey.objects.filter(professor=OuterRef('pk')).order_by().values('professor')
+    groups = GroupProfessor.objects.filter(professor=OuterRef('pk')).order_by().values('professor')
+    return Professor.objects.select_related('school').annotate(
+        survey_count=Coalesce(Subquery(surveys.annotate(total=Count('id')).values('total')), Value(0)),
+        group_count=Coalesce(Subquery(groups.annotate(total=Count('id')).values('total')), Value(0)),
+        rating=Subquery(
+            surveys.annotate(rating=Cast(Sum('rating_sum'), FloatField()) / NullIf(Sum('rating_count'), 0))
+            .values('rating'),
+            output_field=FloatField(),
+        ),
+    )
@@ -0,0 +1,202 @@
+"""
+Incrementally maintained rating rollups.
+
+ProfessorQuestionRollup holds the running totals of every
+(professor, group, question) and DepartmentInternshipRollup of every
+(department, internship question): rating sum, rating count and a histogram
+with the N/A bucket. Submissions add their answers in the same transaction
+with one INSERT ... ON CONFLICT DO UPDATE statement, and deleted surveys and
+answers subtract theirs, so reports read a few hundred rollup rows instead of
+scanning the answer tables. Internship totals follow the department a group had when it
+was answered; run rebuild_rating_rollups after moving groups or bulk edits.
+"""
+from django.db import connection, transaction
+from django.db.models import Count, F, Q, Sum
+
+from .models import (
+    Answer, InternshipAnswer,
+    ProfessorQuestionRollup, DepartmentInternshipRollup,
+)
+
+
+NOT_APPLICABLE = 6
+VALUE_FIELDS = ['rating_sum', 'rating_count', 'count_1', 'count_2', 'count_3', 'count_4', 'count_5', 'na_count']
+BATCH_SIZE = 500
+
+
+def _add(deltas, key, rating_value, sign=1):
+    """Add one rating to the totals of key"""
+    totals = deltas.setdefault(key, [0] * len(VALUE_FIELDS))
+    if rating_value == NOT_APPLICABLE:
+        totals[7] += sign
+    else:
+        totals[0] += sign * rating_value
+        totals[1] += sign
+        totals[1 + rating_value] += sign
+
+
+def _apply(model, key_fields, deltas):
+    """Upsert totals keyed by key_fields, adding to existing rows"""
+    rows = [key + tuple(totals) for key, totals in deltas.items() if any(totals)]
+    if not rows:
+        return
+
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    key_columns = [model._meta.get_field(field).column for field in key_fields]
+    columns = ', '.join(qn(column) for column in key_columns + VALUE_FIELDS)
+    updates = ', '.join(f'{qn(field)} = {table}.{qn(field)} + EXCLUDED.{qn(field)}' for field in VALUE_FIELDS)
+    placeholder = '(' + ', '.join(['%s'] * (len(key_columns) + len(VALUE_FIELDS))) + ')'
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), BATCH_SIZE):
+            batch = rows[start:start + BATCH_SIZE]
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) VALUES {", ".join([placeholder] * len(batch))} '
+                f'ON CONFLICT ({", ".join(qn(column) for column in key_columns)}) DO UPDATE SET {updates}',
+                [value for row in batch for value in row],
+            )
+
+
+def add_survey_answers(answers, sign=1):
+    """Add saved or freshly built professor survey answers to the rollups"""
+    deltas = {}
+    for answer in answers:
+        if answer.rating_value is not None:
+            survey = answer.survey
+            _add(deltas, (survey.professor_id, survey.group_id, answer.question_id), answer.rating_value, sign)
+    _apply(ProfessorQuestionRollup, ['professor', 'group', 'question'], deltas)
+
+
+def add_internship_answers(answers, department_id, sign=1):
+    """Add internship answers of groups of one department to the rollups"""
+    deltas = {}
+    for answer in answers:
+        if answer.rating_value is not None:
+            _add(deltas, (department_id, answer.question_id), answer.rating_value, sign)
+    _apply(DepartmentInternshipRollup, ['department', 'question'], deltas)
+
+
+def remove_survey(survey, professor_id=None, group_id=None):
+    """Subtract the answers of a survey, optionally under a previous professor/group"""
+    deltas = {}
+    ratings = Answer.objects.filter(survey=survey, rating_value__isnull=False).values_list('question_id', 'rating_value')
+    for question_id, rating_value in ratings:
+        key = (professor_id or survey.professor_id, group_id or survey.group_id, question_id)
+        _add(deltas, key, rating_value, -1)
+    _apply(ProfessorQuestionRollup, ['professor', 'group', 'question'], deltas)
+
+
+def remove_internship_survey(internship_survey):
+    """Subtract the answers of an internship survey"""
+    answers = InternshipAnswer.objects.filter(internship_survey=internship_survey, rating_value__isnull=False)
+    add_internship_answers(answers.only('question_id', 'rating_value'), internship_survey.group.department_id, -1)
+
+
+def remove_survey_answer(answer):
+    """Subtract a deleted professor survey answer"""
+    add_survey_answers([answer], -1)
+
+
+def remove_internship_answer(answer):
+    """Subtract a deleted internship answer"""
+    add_internship_answers([answer], answer.internship_survey.group.department_id, -1)
+
+
+def change_survey_answer(answer, old_value):
+    """Move an edited professor survey answer to its new rating bucket"""
+    deltas = {}
+    key = (answer.survey.professor_id, answer.survey.group_id, answer.question_id)
+    if old_value is not None:
+        _add(deltas, key, old_value, -1)
+    if answer.rating_value is not None:
+        _add(deltas, key, answer.rating_value)
+    _apply(ProfessorQuestionRollup, ['professor', 'group', 'question'], deltas)
+
+
+def change_internship_answer(answer, old_value):
+    """Move an edited internship answer to its new rating bucket"""
+    deltas = {}
+    key = (answer.internship_survey.group.department_id, answer.question_id)
+    if old_value is not None:
+        _add(deltas, key, old_value, -1)
+    if answer.rating_value is not None:
+        _add(deltas, key, answer.rating_value)
+    _apply(DepartmentInternshipRollup, ['department', 'question'], deltas)
+
+
+def change_survey_summary(survey_model, survey_id, old_value, new_value):
+    """Update the stored rating summary of a survey whose answer was edited"""
+    deltas = {}
+    if old_value is not None:
+        _add(deltas, survey_id, old_value, -1)
+    if new_value is not None:
+        _add(deltas, survey_id, new_value)
+    totals = deltas.get(survey_id)
+    if totals and any(totals):
+        survey_model.objects.filter(pk=survey_id).update(
+            rating_sum=F('rating_sum') + totals[0],
+            rating_count=F('rating_count') + totals[1],
+            na_count=F('na_count') + totals[7],
+        )
+
+
+def _histogram(value_field):
+    """Aggregates matching the rollup columns for a rating field"""
+    rated = ~Q(**{value_field: NOT_APPLICABLE})
+    return {
+        'rating_sum': Sum(value_field, filter=rated),
+        'rating_count': Count('id', filter=rated),
+        **{f'count_{value}': Count('id', filter=Q(**{value_field: value})) for value in range(1, 6)},
+        'na_count': Count('id', filter=Q(**{value_field: NOT_APPLICABLE})),
+    }
+
+
+def rebuild_rollups():
+    """Recompute every rollup row from the answer tables"""
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            # Concurrent submissions wait until the rebuilt totals are committed
+            with connection.cursor() as cursor:
+                cursor.execute('LOCK TABLE {}, {} IN EXCLUSIVE MODE'.format(
+                    connection.ops.quote_name(ProfessorQuestionRollup._meta.db_table),
+                    connection.ops.quote_name(DepartmentInternshipRollup._meta.db_table),
+                ))
+        _rebuild()
+    return ProfessorQuestionRollup.objects.count(), DepartmentInternshipRollup.objects.count()
+
+
+def _rebuild():
+    professor_rows = (
+        Answer.objects.filter(rating_value__isnull=False)
+        .order_by()
+        .values('survey__professor_id', 'survey__group_id', 'question_id')
+        .annotate(**_histogram('rating_value'))
+    )
+    department_rows = (
+        InternshipAnswer.objects.filter(rating_value__isnull=False)
+        .order_by()
+        .values('internship_survey__group__department_id', 'question_id')
+        .annotate(**_histogram('rating_value'))
+    )
+
+    ProfessorQuestionRollup.objects.all().delete()
+    ProfessorQuestionRollup.objects.bulk_create([
+        ProfessorQuestionRollup(
+            professor_id=row.pop('survey__professor_id'),
+            group_id=row.pop('survey__group_id'),
+            question_id=row.pop('question_id'),
+            **{field: row[field] or 0 for field in VALUE_FIELDS}
+        )
+        for row in professor_rows
+    ], batch_size=BATCH_SIZE)
+
+    DepartmentInternshipRollup.objects.all().delete()
+    DepartmentInternshipRollup.objects.bulk_create([
+        DepartmentInternshipRollup(
+            department_id=row.pop('internship_survey__group__department_id'),
+            question_id=row.pop('question_id'),
+            **{field: row[field] or 0 for field in VALUE_FIELDS}
+        )
+        for row in department_rows
+    ], batch_size=BATCH_SIZE)
@@ -0,0 +1,51 @@
+"""
+Cached professor rosters per group.
+
+The roster of a group is read on every step of the survey flow, so it is kept
+in Django's cache and dropped whenever assignments, professors or schools
+change. Students work from a snapshot of professor ids taken when they start
+the flow, so edits made mid-session never shift their position.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import GroupProfessor
+
+
+ROSTER_VERSION_KEY = 'group_roster_version'
+
+
+def _roster_key(group_id):
+    version = cache.get(ROSTER_VERSION_KEY)
+    if version is None:
+        cache.add(ROSTER_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(ROSTER_VERSION_KEY)
+    return f'group_roster:{version}:{group_id}'
+
+
+def get_group_roster(group_id):
+    """Professors assigned to a group as an ordered {professor_id: Professor} dict"""
+    key = _roster_key(group_id)
+    roster = cache.get(key)
+    if roster is None:
+        assignments = (
+            GroupProfessor.objects.filter(group_id=group_id)
+            .select_related('professor__school')
+            .order_by('professor__full_name', 'professor_id')
+        )
+        roster = {assignment.professor_id: assignment.professor for assignment in assignments}
+        cache.set(key, roster, getattr(settings, 'GROUP_ROSTER_TIMEOUT', 3600))
+    return roster
+
+
+def invalidate_group_roster(group_id):
+    """Drop the cached roster of one group once the transaction commits"""
+    transaction.on_commit(lambda: cache.delete(_roster_key(group_id)))
+
+
+def invalidate_all_rosters():
+    """Drop every cached roster once the transaction commits"""
+    transaction.on_commit(lambda: cache.set(ROSTER_VERSION_KEY, time.time_ns(), None))
@@ -0,0 +1,102 @@
+"""
+Full-text search over the open-ended answers of both survey types.
+
+Answers are matched on text_search_vector() (see models.py), which the GIN
+indexes on Answer and InternshipAnswer are built on, so a search reads the
+index instead of scanning the answer tables. Queries use web search syntax
+("quoted phrases", or, -excluded) and matches are highlighted with
+ts_headline.
+"""
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .extracts import submitted_between
+from .models import Answer, InternshipAnswer, text_search_vector
+
+
+SEARCH_LIMIT = 100
+# Markers around matches, replaced with <mark> after the text is escaped
+START_SEL = '\x02'
+STOP_SEL = '\x03'
+
+
+def search_query(text):
+    return SearchQuery(text, config='russian', search_type='websearch') | SearchQuery(
+        text, config='simple', search_type='websearch'
+    )
+
+
+def _headline(config, query):
+    return SearchHeadline(
+        'text_value', query, config=config, start_sel=START_SEL, stop_sel=STOP_SEL,
+        max_words=40, min_words=15, max_fragments=3,
+    )
+
+
+def _highlight(answer):
+    # Stopwords and Uzbek words only match the 'simple' half of the vector
+    headline = answer.headline if START_SEL in answer.headline else answer.simple_headline
+    return mark_safe(escape(headline).replace(START_SEL, '<mark>').replace(STOP_SEL, '</mark>'))
+
+
+def matching_answers(answers, text):
+    """Answers (or internship answers) whose comment matches a web search query"""
+    query = search_query(text)
+    return answers.filter(text_value__isnull=False).annotate(search=text_search_vector()).filter(search=query)
+
+
+def _matches(answers, query, survey_prefix, date_from=None, date_to=None, department_id=None):
+    answers = submitted_between(answers.filter(text_value__isnull=False), survey_prefix, date_from, date_to)
+    if department_id:
+        answers = answers.filter(**{f'{survey_prefix}group__department_id': department_id})
+    vector = text_search_vector()
+    return (
+        answers.annotate(search=vector, rank=SearchRank(vector, query))
+        .filter(search=query)
+        .annotate(headline=_headline('russian', query), simple_headline=_headline('simple', query))
+        .order_by('-rank', '-id')
+    )
+
+
+def search_comments(text, professor_id=None, department_id=None, date_from=None, date_to=None, limit=SEARCH_LIMIT):
+    """Best matching professor and internship survey comments, highest rank first"""
+    query = search_query(text)
+    filters = {'date_from': date_from, 'date_to': date_to, 'department_id': department_id}
+
+    answers = Answer.objects.select_related('survey__professor', 'survey__group__department', 'question')
+    if professor_id:
+        answers = answers.filter(survey__professor_id=professor_id)
+    results = [
+        {
+            'type': 'professor',
+            'answer': answer,
+            'survey': answer.survey,
+            'professor': answer.survey.professor,
+            'group': answer.survey.group,
+            'question': answer.question,
+            'rank': answer.rank,
+            'headline': _highlight(answer),
+        }
+        for answer in _matches(answers, query, 'survey__', **filters)[:limit]
+    ]
+
+    # Internship surveys have no professor
+    if not professor_id:
+        answers = InternshipAnswer.objects.select_related('internship_survey__group__department', 'question')
+        results.extend(
+            {
+                'type': 'internship',
+                'answer': answer,
+                'survey': answer.internship_survey,
+                'professor': None,
+                'group': answer.internship_survey.group,
+                'question': answer.question,
+                'rank': answer.rank,
+                'headline': _highlight(answer),
+            }
+            for answer in _matches(answers, query, 'internship_survey__', **filters)[:limit]
+        )
+
+    results.sort(key=lambda result: result['rank'], reverse=True)
+    return results[:limit]
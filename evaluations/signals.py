@@ -0,0 +1,135 @@
+"""
+Signal handlers that keep cached survey data and rating rollups in sync with
+admin edits.
+"""
+from django.db.models.signals import post_save, post_delete, pre_save, pre_delete
+from django.dispatch import receiver
+
+from . import rollups
+from .catalog import invalidate_catalog
+from .export_jobs import bump_data_version
+from .forms import invalidate_group_choices
+from .models import (
+    School, Department, Group, Professor, GroupProfessor, Question, InternshipQuestion,
+    Survey, Answer, InternshipSurvey, InternshipAnswer,
+)
+from .roster import invalidate_group_roster, invalidate_all_rosters
+
+
+@receiver([post_save, post_delete], sender=Question)
+def question_changed(sender, **kwargs):
+    """Rebuild the survey question catalog"""
+    invalidate_catalog('survey')
+
+
+@receiver([post_save, post_delete], sender=InternshipQuestion)
+def internship_question_changed(sender, **kwargs):
+    """Rebuild the internship question catalog"""
+    invalidate_catalog('internship')
+
+
+@receiver([post_save, post_delete], sender=GroupProfessor)
+def assignment_changed(sender, instance, **kwargs):
+    """Rebuild the professor roster of the affected group"""
+    invalidate_group_roster(instance.group_id)
+
+
+@receiver(post_save, sender=Professor)
+@receiver(post_save, sender=School)
+def roster_entry_changed(sender, **kwargs):
+    """Professor names and schools are shown from the cached rosters"""
+    invalidate_all_rosters()
+
+
+@receiver([post_save, post_delete], sender=Group)
+@receiver([post_save, post_delete], sender=Department)
+@receiver([post_save, post_delete], sender=School)
+def group_choices_changed(sender, **kwargs):
+    """Rebuild the landing page group dropdown"""
+    invalidate_group_choices()
+
+
+@receiver([post_save, post_delete], sender=Group)
+@receiver([post_save, post_delete], sender=Department)
+@receiver([post_save, post_delete], sender=School)
+@receiver([post_save, post_delete], sender=Professor)
+@receiver([post_save, post_delete], sender=Question)
+@receiver([post_save, post_delete], sender=InternshipQuestion)
+@receiver([post_save, post_delete], sender=Survey)
+@receiver([post_save, post_delete], sender=Answer)
+@receiver([post_save, post_delete], sender=InternshipSurvey)
+@receiver([post_save, post_delete], sender=InternshipAnswer)
+def report_data_changed(sender, created=False, **kwargs):
+    """Build fresh rating exports and dashboard statistics instead of reusing stored ones"""
+    # New surveys already change the data version through the survey counts
+    if created and sender in (Survey, InternshipSurvey):
+        return
+    bump_data_version()
+
+
+@receiver(pre_delete, sender=Survey)
+def survey_deleted(sender, instance, **kwargs):
+    """Subtract the answers of a deleted survey from the rollups"""
+    rollups.remove_survey(instance)
+
+
+@receiver(pre_save, sender=Survey)
+def survey_moved(sender, instance, **kwargs):
+    """Move the answers of a survey reassigned to another professor or group"""
+    if instance.pk is None:
+        return
+    previous = Survey.objects.filter(pk=instance.pk).values_list('professor_id', 'group_id').first()
+    if previous and previous != (instance.professor_id, instance.group_id):
+        rollups.remove_survey(instance, *previous)
+        rollups.add_survey_answers(instance.answers.all())
+
+
+@receiver(pre_save, sender=Answer)
+def answer_edited(sender, instance, **kwargs):
+    """Keep the rollups and survey summary in step with edited ratings"""
+    if instance.pk is None:
+        return
+    previous = Answer.objects.filter(pk=instance.pk).values_list('rating_value', flat=True).first()
+    if previous != instance.rating_value:
+        rollups.change_survey_answer(instance, previous)
+        rollups.change_survey_summary(Survey, instance.survey_id, previous, instance.rating_value)
+
+
+def _deleted_directly(origin, model):
+    """Whether a deletion started from model itself rather than a cascade"""
+    return isinstance(origin, model) or getattr(origin, 'model', None) is model
+
+
+@receiver(pre_delete, sender=Answer)
+def answer_deleted(sender, instance, origin=None, **kwargs):
+    """Subtract a deleted answer from the rollups and survey summary"""
+    # Answers deleted along with their survey are subtracted by survey_deleted
+    if _deleted_directly(origin, Answer) and instance.rating_value is not None:
+        rollups.remove_survey_answer(instance)
+        rollups.change_survey_summary(Survey, instance.survey_id, instance.rating_value, None)
+
+
+@receiver(pre_delete, sender=InternshipSurvey)
+def internship_survey_deleted(sender, instance, **kwargs):
+    """Subtract the answers of a deleted internship survey from the rollups"""
+    rollups.remove_internship_survey(instance)
+
+
+@receiver(pre_save, sender=InternshipAnswer)
+def internship_answer_edited(sender, instance, **kwargs):
+    """Keep the rollups and survey summary in step with edited internship ratings"""
+    if instance.pk is None:
+        return
+    previous = InternshipAnswer.objects.filter(pk=instance.pk).values_list('rating_value', flat=True).first()
+    if previous != instance.rating_value:
+        rollups.change_internship_answer(instance, previous)
+        rollups.change_survey_summary(InternshipSurvey, instance.internship_survey_id, previous, instance.rating_value)
+
+
+@receiver(pre_delete, sender=InternshipAnswer)
+def internship_answer_deleted(sender, instance, origin=None, **kwargs):
+    """Subtract a deleted internship answer from the rollups and survey summary"""
+    # Answers deleted along with their survey are subtracted by internship_survey_deleted
+    if _deleted_directly(origin, InternshipAnswer) and instance.rating_value is not None:
+        rollups.remove_internship_answer(instance)
+        rollups.change_survey_summary(InternshipSurvey, instance.internship_survey_id, instance.rating_value, None)
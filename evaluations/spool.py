@@ -0,0 +1,67 @@
+"""
+Durable write-behind spool for survey submissions.
+
+When SURVEY_SUBMISSION_SPOOL points to a file, validated submissions are
+appended to a local SQLite journal and acknowledged immediately instead of
+being written to the main database. The drain_submissions management command
+flushes the journal into Survey/Answer/InternshipSurvey rows in batches.
+Every spooled survey carries a submission token, so draining is idempotent.
+"""
+import json
+import sqlite3
+import threading
+
+from django.conf import settings
+
+
+_local = threading.local()
+
+
+def spool_enabled():
+    """True if submissions should be written to the spool"""
+    return bool(getattr(settings, 'SURVEY_SUBMISSION_SPOOL', ''))
+
+
+def _connection():
+    path = str(settings.SURVEY_SUBMISSION_SPOOL)
+    connection = getattr(_local, 'connection', None)
+    if connection is None or getattr(_local, 'path', None) != path:
+        connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=FULL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS submissions ('
+            'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+            'payload TEXT NOT NULL)'
+        )
+        _local.connection = connection
+        _local.path = path
+    return connection
+
+
+def append(payload):
+    """Durably append one submission payload to the journal"""
+    _connection().execute(
+        'INSERT INTO submissions (payload) VALUES (?)',
+        (json.dumps(payload, ensure_ascii=False),)
+    )
+
+
+def read_batch(limit):
+    """Oldest spooled submissions as a list of (entry_id, payload)"""
+    rows = _connection().execute(
+        'SELECT id, payload FROM submissions ORDER BY id LIMIT ?', (limit,)
+    ).fetchall()
+    return [(entry_id, json.loads(payload)) for entry_id, payload in rows]
+
+
+def remove(entry_ids):
+    """Delete drained submissions from the journal"""
+    if entry_ids:
+        placeholders = ','.join('?' * len(entry_ids))
+        _connection().execute(f'DELETE FROM submissions WHERE id IN ({placeholders})', list(entry_ids))
+
+
+def pending_count():
+    """Number of submissions waiting to be drained"""
+    return _connection().execute('SELECT COUNT(*) FROM submissions').fetchone()[0]
@@ -0,0 +1,327 @@
+"""
+Persistence of validated survey submissions.
+
+A submission is written as one Survey (or InternshipSurvey) row plus all of its
+answers in a single transaction, using one bulk insert for the answers. The
+rating rollups are updated in the same transaction. When the write-behind spool
+is enabled, submissions are journaled locally instead and written later by
+apply_spooled_submissions().
+"""
+import uuid
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Q, When
+from django.db.models.functions import Least
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import rollups, spool
+from .models import (
+    Group, Professor, Survey, Question, Answer,
+    InternshipSurvey, InternshipQuestion, InternshipAnswer,
+)
+
+
+def build_answers(answer_model, survey_field, survey, question_map, cleaned_data):
+    """Build unsaved answer objects from cleaned form data"""
+    answers = []
+    for field_name, value in cleaned_data.items():
+        if not field_name.startswith('question_'):
+            continue
+        question = question_map.get(int(field_name.split('_')[1]))
+        if question is None:
+            continue
+
+        if question.question_type == 'rating':
+            answers.append(answer_model(
+                question=question,
+                rating_value=int(value),
+                **{survey_field: survey}
+            ))
+        else:
+            answers.append(answer_model(
+                question=question,
+                text_value=value,
+                **{survey_field: survey}
+            ))
+    return answers
+
+
+def summarize_ratings(survey, answers):
+    """Store the rating summary of a survey being created from its answers"""
+    ratings = [answer.rating_value for answer in answers if answer.rating_value is not None]
+    survey.rating_sum = sum(rating for rating in ratings if rating != rollups.NOT_APPLICABLE)
+    survey.rating_count = sum(1 for rating in ratings if rating != rollups.NOT_APPLICABLE)
+    survey.na_count = len(ratings) - survey.rating_count
+    return survey
+
+
+def record_participation(group_id, count=1):
+    """
+    Atomically increment the participated students count of a group.
+
+    The increment is a single UPDATE with an F() expression, so concurrent
+    completions never lose updates and no other column of the group is
+    rewritten. With PARTICIPATION_ENFORCE_QUOTA the count stops at
+    total_students (0 means unknown); returns False if it was not incremented.
+    """
+    groups = Group.objects.filter(pk=group_id)
+    increment = F('participated_students') + count
+    if getattr(settings, 'PARTICIPATION_ENFORCE_QUOTA', False):
+        groups = groups.filter(Q(total_students=0) | Q(participated_students__lt=F('total_students')))
+        increment = Case(
+            When(total_students=0, then=increment),
+            default=Least(increment, F('total_students')),
+        )
+    return groups.update(participated_students=increment) == 1
+
+
+def group_is_full(group):
+    """True if the group has reached its participation quota"""
+    return (
+        getattr(settings, 'PARTICIPATION_ENFORCE_QUOTA', False)
+        and group.total_students > 0
+        and group.participated_students >= group.total_students
+    )
+
+
+def _already_saved(survey_tokens=(), internship_tokens=()):
+    """Whether an IntegrityError came from a submission token that is already saved"""
+    survey_tokens = [token for token in survey_tokens if token]
+    internship_tokens = [token for token in internship_tokens if token]
+    return (
+        bool(survey_tokens) and Survey.objects.filter(submission_token__in=survey_tokens).exists()
+        or bool(internship_tokens) and InternshipSurvey.objects.filter(submission_token__in=internship_tokens).exists()
+    )
+
+
+def save_survey_submission(group, professor, cleaned_data, question_map, count_participation=False,
+                           submission_token=None):
+    """
+    Save a professor evaluation and all of its answers.
+
+    Returns None if a survey with the same submission token already exists.
+    """
+    if spool.spool_enabled():
+        return spool_submission(group, [(professor, cleaned_data, submission_token)],
+                                count_participation=count_participation)
+
+    try:
+        with transaction.atomic():
+            survey = Survey(group=group, professor=professor, submission_token=submission_token)
+            answers = build_answers(Answer, 'survey', survey, question_map, cleaned_data)
+            summarize_ratings(survey, answers).save()
+            Answer.objects.bulk_create(answers)
+            rollups.add_survey_answers(answers)
+            if count_participation:
+                record_participation(group.id)
+    except IntegrityError:
+        if not _already_saved(survey_tokens=[submission_token]):
+            raise
+        return None
+    return survey
+
+
+def save_internship_submission(group, cleaned_data, question_map, count_participation=True,
+                               submission_token=None):
+    """
+    Save an internship evaluation and all of its answers.
+
+    Returns None if a survey with the same submission token already exists.
+    """
+    if spool.spool_enabled():
+        return spool_submission(group, [], cleaned_data, submission_token,
+                                count_participation=count_participation)
+
+    try:
+        with transaction.atomic():
+            internship_survey = InternshipSurvey(group=group, submission_token=submission_token)
+            answers = build_answers(InternshipAnswer, 'internship_survey', internship_survey, question_map, cleaned_data)
+            summarize_ratings(internship_survey, answers).save()
+            InternshipAnswer.objects.bulk_create(answers)
+            rollups.add_internship_answers(answers, group.department_id)
+            if count_participation:
+                record_participation(group.id)
+    except IntegrityError:
+        if not _already_saved(internship_tokens=[submission_token]):
+            raise
+        return None
+    return internship_survey
+
+
+def save_batch_submission(group, evaluations, question_map, internship_data=None, internship_question_map=None,
+                          internship_token=None):
+    """
+    Save every professor evaluation of one student, and the internship survey
+    if given, together with the participation count in one transaction.
+
+    evaluations is a list of (professor, cleaned_data, submission_token)
+    tuples. Returns None if the submission was already saved.
+    """
+    if spool.spool_enabled():
+        return spool_submission(group, evaluations, internship_data, internship_token, count_participation=True)
+
+    try:
+        with transaction.atomic():
+            surveys, answers = [], []
+            for professor, cleaned_data, token in evaluations:
+                survey = Survey(group=group, professor=professor, submission_token=token)
+                survey_answers = build_answers(Answer, 'survey', survey, question_map, cleaned_data)
+                surveys.append(summarize_ratings(survey, survey_answers))
+                answers.extend(survey_answers)
+            Survey.objects.bulk_create(surveys)
+            Answer.objects.bulk_create(answers)
+            rollups.add_survey_answers(answers)
+
+            if internship_data is not None:
+                internship_survey = InternshipSurvey(group=group, submission_token=internship_token)
+                internship_answers = build_answers(
+                    InternshipAnswer, 'internship_survey', internship_survey, internship_question_map, internship_data
+                )
+                summarize_ratings(internship_survey, internship_answers).save()
+                InternshipAnswer.objects.bulk_create(internship_answers)
+                rollups.add_internship_answers(internship_answers, group.department_id)
+
+            record_participation(group.id)
+    except IntegrityError:
+        survey_tokens = [token for professor, cleaned_data, token in evaluations]
+        if not _already_saved(survey_tokens, [internship_token]):
+            raise
+        return None
+    return surveys
+
+
+def spool_submission(group, evaluations, internship_data=None, internship_token=None, count_participation=False):
+    """
+    Journal a submission in the write-behind spool instead of the database.
+
+    evaluations is a list of (professor, cleaned_data, submission_token)
+    tuples; missing tokens are generated so draining stays idempotent.
+    """
+    spool.append({
+        'group_id': group.id,
+        'created_at': timezone.now().isoformat(),
+        'count_participation': count_participation,
+        'surveys': [
+            {'token': str(token or uuid.uuid4()), 'professor_id': professor.id, 'answers': cleaned_data}
+            for professor, cleaned_data, token in evaluations
+        ],
+        'internship': (
+            {'token': str(internship_token or uuid.uuid4()), 'answers': internship_data}
+            if internship_data is not None else None
+        ),
+    })
+
+
+def _payload_tokens(payload):
+    tokens = [survey['token'] for survey in payload['surveys']]
+    if payload['internship']:
+        tokens.append(payload['internship']['token'])
+    return tokens
+
+
+def _question_ids(answer_sets):
+    return {int(field_name.split('_')[1]) for answers in answer_sets for field_name in answers}
+
+
+def apply_spooled_submissions(payloads):
+    """
+    Write a batch of spooled submissions in one transaction.
+
+    Each payload is all-or-nothing, so a payload whose submission tokens
+    already exist was written by an earlier run and is skipped. Returns the
+    number of payloads written.
+    """
+    with transaction.atomic():
+        tokens = [token for payload in payloads for token in _payload_tokens(payload)]
+        written = {
+            str(token) for token in Survey.objects.filter(submission_token__in=tokens)
+            .values_list('submission_token', flat=True)
+        }
+        written |= {
+            str(token) for token in InternshipSurvey.objects.filter(submission_token__in=tokens)
+            .values_list('submission_token', flat=True)
+        }
+        # Retried submissions may also be spooled more than once
+        unique_payloads = []
+        for payload in payloads:
+            payload_tokens = _payload_tokens(payload)
+            if not written.intersection(payload_tokens):
+                written.update(payload_tokens)
+                unique_payloads.append(payload)
+        payloads = unique_payloads
+
+        # Rows deleted since the submission was spooled are dropped
+        group_departments = dict(Group.objects.filter(
+            id__in={payload['group_id'] for payload in payloads}
+        ).values_list('id', 'department_id'))
+        payloads = [payload for payload in payloads if payload['group_id'] in group_departments]
+        professor_ids = set(Professor.objects.filter(
+            id__in={survey['professor_id'] for payload in payloads for survey in payload['surveys']}
+        ).values_list('id', flat=True))
+
+        question_map = Question.objects.in_bulk(_question_ids(
+            survey['answers'] for payload in payloads for survey in payload['surveys']
+        ))
+        internship_question_map = InternshipQuestion.objects.in_bulk(_question_ids(
+            payload['internship']['answers'] for payload in payloads if payload['internship']
+        ))
+
+        surveys, survey_answers = [], []
+        internship_surveys, internship_answers = [], []
+        participation = Counter()
+        for payload in payloads:
+            created_at = parse_datetime(payload['created_at'])
+            for item in payload['surveys']:
+                if item['professor_id'] not in professor_ids:
+                    continue
+                survey = Survey(
+                    group_id=payload['group_id'],
+                    professor_id=item['professor_id'],
+                    submission_token=item['token'],
+                )
+                survey._spooled_at = created_at
+                surveys.append(survey)
+                survey_answers.append(item['answers'])
+            if payload['internship']:
+                internship_survey = InternshipSurvey(
+                    group_id=payload['group_id'],
+                    submission_token=payload['internship']['token'],
+                )
+                internship_survey._spooled_at = created_at
+                internship_surveys.append(internship_survey)
+                internship_answers.append(payload['internship']['answers'])
+            if payload['count_participation']:
+                participation[payload['group_id']] += 1
+
+        written_answers = {}
+        for survey_model, answer_model, survey_field, rows, answer_sets, questions in [
+            (Survey, Answer, 'survey', surveys, survey_answers, question_map),
+            (InternshipSurvey, InternshipAnswer, 'internship_survey', internship_surveys, internship_answers, internship_question_map),
+        ]:
+            answers = []
+            for row, cleaned_data in zip(rows, answer_sets):
+                row_answers = build_answers(answer_model, survey_field, row, questions, cleaned_data)
+                summarize_ratings(row, row_answers)
+                answers.extend(row_answers)
+            survey_model.objects.bulk_create(rows)
+            # Keep the time the student submitted, not the time of the drain
+            for row in rows:
+                row.created_at = row._spooled_at
+            survey_model.objects.bulk_update(rows, ['created_at'], batch_size=500)
+            answer_model.objects.bulk_create(answers, batch_size=1000)
+            written_answers[answer_model] = answers
+
+        rollups.add_survey_answers(written_answers[Answer])
+        by_department = defaultdict(list)
+        for answer in written_answers[InternshipAnswer]:
+            by_department[group_departments[answer.internship_survey.group_id]].append(answer)
+        for department_id, department_answers in by_department.items():
+            rollups.add_internship_answers(department_answers, department_id)
+
+        for group_id, count in participation.items():
+            record_participation(group_id, count)
+
+    return len(payloads)
@@ -0,0 +1,31 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from evaluations.models import School, Department, Group
+
+
+@override_settings(GROUPS_PAGE_SIZE=2)
+class GroupsListTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        school = School.objects.create(name='School of Engineering', code='SOE')
+        department = Department.objects.create(school=school, name='Computer Science', code='CS')
+        for number in range(5):
+            Group.objects.create(group_name=f'CS-10{number}', department=department, semester=1, total_students=20)
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_renders_one_page_of_groups(self):
+        response = self.client.get(reverse('admin_groups_list'))
+        self.assertEqual([group.group_name for group in response.context['groups']], ['CS-100', 'CS-101'])
+        self.assertNotContains(response, 'CS-102')
+        self.assertContains(response, 'page=2')
+
+    def test_last_page_keeps_the_search(self):
+        response = self.client.get(reverse('admin_groups_list'), {'q': 'CS', 'page': 3})
+        self.assertEqual([group.group_name for group in response.context['groups']], ['CS-104'])
+        self.assertContains(response, 'q=CS&amp;page=2')
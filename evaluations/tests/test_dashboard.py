@@ -0,0 +1,24 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from evaluations.dashboard import get_dashboard_stats
+from evaluations.models import School, Department, Group, Professor, Survey
+
+
+class DashboardStatsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        school = School.objects.create(name='School of Engineering', code='SOE')
+        department = Department.objects.create(school=school, name='Computer Science', code='CS')
+        cls.group = Group.objects.create(group_name='CS-101', department=department, semester=1, total_students=20)
+        cls.professor = Professor.objects.create(full_name='Test Professor', school=school)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_drained_submissions_show_up_without_invalidation(self):
+        self.assertEqual(get_dashboard_stats()['total_surveys'], 0)
+        # drain_submissions bulk inserts from another process, without signals
+        Survey.objects.bulk_create([Survey(group=self.group, professor=self.professor)])
+        self.assertEqual(get_dashboard_stats()['total_surveys'], 1)
@@ -0,0 +1,58 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from evaluations.export_jobs import artifact_path, claim_next_job, data_version, enqueue_export, run_job
+from evaluations.models import School, Department, Group, Professor, Survey
+
+
+class ExportJobVersionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        school = School.objects.create(name='School of Engineering', code='SOE')
+        department = Department.objects.create(school=school, name='Computer Science', code='CS')
+        cls.group = Group.objects.create(group_name='CS-101', department=department, semester=1, total_students=20)
+        cls.professor = Professor.objects.create(full_name='Test Professor', school=school)
+
+    def setUp(self):
+        storage = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, storage)
+        settings_override = override_settings(EXPORT_STORAGE_DIR=storage)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def build(self, kind='professors_rating'):
+        job = enqueue_export(kind)
+        claimed = claim_next_job()
+        if claimed is not None:
+            run_job(claimed)
+        job.refresh_from_db()
+        return job
+
+    def test_current_export_is_reused(self):
+        job = self.build()
+        self.assertEqual(job.status, 'done')
+        self.assertTrue(artifact_path(job).exists())
+        self.assertEqual(enqueue_export('professors_rating'), job)
+
+    def test_command_outside_the_request_path_invalidates_export(self):
+        job = self.build()
+        version = data_version()
+        # Management commands run in their own process with their own cache
+        call_command('rebuild_rating_rollups', stdout=StringIO())
+        cache.clear()
+        self.assertNotEqual(data_version(), version)
+        self.assertNotEqual(self.build(), job)
+
+    def test_new_survey_invalidates_export(self):
+        job = self.build()
+        # Spooled submissions are bulk inserted without signals
+        Survey.objects.bulk_create([Survey(group=self.group, professor=self.professor)])
+        rebuilt = self.build()
+        self.assertNotEqual(rebuilt, job)
+        self.assertEqual(rebuilt.status, 'done')
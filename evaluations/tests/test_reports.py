@@ -0,0 +1,62 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from evaluations.models import (
+    School, Department, Group, Professor, Question, Survey, Answer,
+    InternshipQuestion, InternshipSurvey, InternshipAnswer,
+)
+
+
+NOT_APPLICABLE = 6
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Materialized rating views require PostgreSQL')
+@override_settings(RATING_REPORT_SOURCE='materialized')
+class MaterializedReportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        school = School.objects.create(name='School of Engineering', code='SOE')
+        department = Department.objects.create(school=school, name='Computer Science', code='CS')
+        group = Group.objects.create(group_name='CS-101', department=department, semester=1, total_students=20)
+        professor = Professor.objects.create(full_name='Test Professor', school=school)
+
+        rated = Question.objects.create(text_en='Rated', text_uz='Rated', text_ru='Rated', question_type='rating', order=1)
+        not_applicable = Question.objects.create(
+            text_en='Not applicable', text_uz='Not applicable', text_ru='Not applicable', question_type='rating', order=2
+        )
+        internship_rated = InternshipQuestion.objects.create(
+            text_en='Rated', text_uz='Rated', text_ru='Rated', question_type='rating', order=1
+        )
+        internship_not_applicable = InternshipQuestion.objects.create(
+            text_en='Not applicable', text_uz='Not applicable', text_ru='Not applicable', question_type='rating', order=2
+        )
+
+        for rating in (1, 2):
+            survey = Survey.objects.create(group=group, professor=professor)
+            Answer.objects.create(survey=survey, question=rated, rating_value=rating)
+            Answer.objects.create(survey=survey, question=not_applicable, rating_value=NOT_APPLICABLE)
+            internship_survey = InternshipSurvey.objects.create(group=group)
+            InternshipAnswer.objects.create(internship_survey=internship_survey, question=internship_rated, rating_value=rating)
+            InternshipAnswer.objects.create(
+                internship_survey=internship_survey, question=internship_not_applicable, rating_value=NOT_APPLICABLE
+            )
+
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        call_command('refresh_rating_views', stdout=StringIO())
+        self.client.force_login(self.admin)
+
+    def test_reports_render_questions_answered_only_not_applicable(self):
+        for name in ('admin_professors_rating', 'admin_internship_department_rating', 'admin_internship_school_rating'):
+            with self.subTest(report=name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, '1.5')
@@ -5,6 +5,7 @@ urlpatterns = [
     # Public survey flow
     path('', views.home, name='home'),
     path('survey/', views.survey, name='survey'),
+    path('survey/all/', views.survey_batch, name='survey_batch'),
     path('internship-survey/', views.internship_survey, name='internship_survey'),
     path('thank-you/', views.thank_you, name='thank_you'),
     
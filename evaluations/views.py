@@ -1,23 +1,35 @@
+import uuid
+
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils.translation import gettext as _, get_language
-from django.db import transaction
-from .models import Group, Professor, GroupProfessor, Survey, Question, Answer, InternshipQuestion, InternshipSurvey, InternshipAnswer
+from .models import Group, Professor, Survey, Answer
+from .catalog import get_catalog
 from .forms import GroupSelectionForm, DynamicSurveyForm, DynamicInternshipSurveyForm
+from .roster import get_group_roster
+from .submissions import save_survey_submission, save_internship_submission, save_batch_submission, group_is_full
 
 
 def home(request):
     """Landing page with group selection"""
     if request.method == 'POST':
         form = GroupSelectionForm(request.POST)
-        if form.is_valid():
+        if form.is_valid() and group_is_full(form.cleaned_data['group']):
+            form.add_error('group', _('All students of this group have already completed the evaluation.'))
+        elif form.is_valid():
             group = form.cleaned_data['group']
             language = form.cleaned_data['language']
             # Store group_id and language in session
-            request.session['survey_group_id'] = group.id
-            request.session['survey_language'] = language
-            request.session['survey_professor_index'] = 0
+            request.survey_state['survey_group_id'] = group.id
+            request.survey_state['survey_language'] = language
+            request.survey_state['survey_professor_index'] = 0
+            request.survey_state['survey_flow_id'] = uuid.uuid4().hex
+            # Snapshot the roster so assignment edits can't shift the flow
+            request.survey_state['survey_professor_ids'] = list(get_group_roster(group.id))
+            if getattr(settings, 'SURVEY_BATCH_MODE', False):
+                return redirect('survey_batch')
             return redirect('survey')
     else:
         form = GroupSelectionForm()
@@ -25,108 +37,106 @@ def home(request):
     return render(request, 'evaluations/home.html', {'form': form})
 
 
+def _submission_token(request, step):
+    """One-time token for a step of the current flow, the same on every retry"""
+    flow_id = request.survey_state.get('survey_flow_id')
+    if flow_id is None:
+        flow_id = uuid.uuid4().hex
+        request.survey_state['survey_flow_id'] = flow_id
+    return uuid.uuid5(uuid.UUID(flow_id), step)
+
+
 def survey(request):
     """Sequential professor evaluation with dynamic questions"""
     # Get group from session
-    group_id = request.session.get('survey_group_id')
+    group_id = request.survey_state.get('survey_group_id')
     if not group_id:
         return redirect('home')
     
     group = get_object_or_404(Group, id=group_id)
     
-    # Get list of professors for this group
-    professor_assignments = GroupProfessor.objects.filter(group=group).select_related('professor')
-    professors = [assignment.professor for assignment in professor_assignments]
+    # Get list of professors for this group (snapshot taken at flow start)
+    roster = get_group_roster(group.id)
+    professors = request.survey_state.get('survey_professor_ids')
+    if professors is None:
+        professors = list(roster)
+        request.survey_state['survey_professor_ids'] = professors
     
     if not professors:
         messages.warning(request, _('No professors assigned to this group.'))
         return redirect('home')
     
     # Get current professor index
-    current_index = request.session.get('survey_professor_index', 0)
+    current_index = request.survey_state.get('survey_professor_index', 0)
     
     # Check if we've finished all professors
     if current_index >= len(professors):
         return redirect('thank_you')
     
-    current_professor = professors[current_index]
+    current_professor = roster.get(professors[current_index])
+    if current_professor is None:
+        # Professor was unassigned after the flow started - move on
+        request.survey_state['survey_professor_index'] = current_index + 1
+        return redirect('survey')
     
     # Get language from session (set during group selection)
-    current_language = request.session.get('survey_language', 'en')
+    current_language = request.survey_state.get('survey_language', 'en')
     
     # Get all active questions with localized text
-    questions_qs = Question.objects.filter(is_active=True).order_by('order')
-    questions = []
-    for q in questions_qs:
-        questions.append({
-            'id': q.id,
-            'question_type': q.question_type,
-            'order': q.order,
-            'get_text': q.get_text(current_language)
-        })
+    catalog = get_catalog('survey')
+    questions = catalog.for_language(current_language)
+    
+    submission_token = _submission_token(request, f'survey:{current_professor.id}')
     
     # Handle form submission
     if request.method == 'POST':
+        # A resubmitted page for a step that is already done - nothing to do
+        if request.POST.get('submission_token') != str(submission_token):
+            return redirect('survey')
+        
         # Check if user clicked "Not my professor"
         if 'skip_professor' in request.POST:
             # Skip this professor, move to next
-            request.session['survey_professor_index'] = current_index + 1
+            request.survey_state['survey_professor_index'] = current_index + 1
             return redirect('survey')
         
         # Otherwise, process the evaluation form
-        form = DynamicSurveyForm(request.POST, language=current_language)
+        form = DynamicSurveyForm.for_language(current_language, catalog)(request.POST)
         if form.is_valid():
-            # Create survey session
-            survey = Survey.objects.create(
-                group=group,
-                professor=current_professor
+            is_last = current_index + 1 >= len(professors)
+            # Semester 1 finishes here, so participation is counted with the last survey
+            save_survey_submission(
+                group,
+                current_professor,
+                form.cleaned_data,
+                form.question_map,
+                count_participation=is_last and group.semester <= 1,
+                submission_token=submission_token
             )
             
-            # Save all answers
-            for field_name, value in form.cleaned_data.items():
-                if field_name.startswith('question_'):
-                    question_id = int(field_name.split('_')[1])
-                    question = Question.objects.get(id=question_id)
-                    
-                    if question.question_type == 'rating':
-                        Answer.objects.create(
-                            survey=survey,
-                            question=question,
-                            rating_value=int(value)
-                        )
-                    else:
-                        Answer.objects.create(
-                            survey=survey,
-                            question=question,
-                            text_value=value
-                        )
-            
             # Move to next professor
-            request.session['survey_professor_index'] = current_index + 1
+            request.survey_state['survey_professor_index'] = current_index + 1
             
             # Check if this was the last professor
-            if current_index + 1 >= len(professors):
+            if is_last:
                 # Check if group needs to complete internship survey (semester 2-8)
                 if group.semester > 1:
                     # Keep group_id in session for internship survey
-                    request.session.pop('survey_professor_index', None)
+                    request.survey_state.pop('survey_professor_index', None)
+                    request.survey_state.pop('survey_professor_ids', None)
                     return redirect('internship_survey')
                 else:
                     # Semester 1 - go directly to thank you
-                    # Increment participated students count
-                    with transaction.atomic():
-                        group.participated_students += 1
-                        group.save()
-                    
                     # Clear session data
-                    request.session.pop('survey_group_id', None)
-                    request.session.pop('survey_professor_index', None)
+                    request.survey_state.pop('survey_group_id', None)
+                    request.survey_state.pop('survey_professor_index', None)
+                    request.survey_state.pop('survey_professor_ids', None)
                     
                     return redirect('thank_you')
             
             return redirect('survey')
     else:
-        form = DynamicSurveyForm(language=current_language)
+        form = DynamicSurveyForm.for_language(current_language, catalog)()
     
     # Calculate progress
     total_professors = len(professors)
@@ -140,17 +150,129 @@ def survey(request):
         'total_professors': total_professors,
         'progress_percentage': progress_percentage,
         'questions': questions,
+        'submission_token': submission_token,
     }
     
     return render(request, 'evaluations/survey.html', context)
 
 
+def _question_rows(questions, form):
+    """Localized questions with the submitted value and errors of each field"""
+    rows = []
+    for question in questions:
+        field_name = f'question_{question["id"]}'
+        rows.append({
+            **question,
+            'field_name': form.add_prefix(field_name),
+            'value': form.data.get(form.add_prefix(field_name), '') if form.is_bound else '',
+            'errors': form.errors.get(field_name) if form.is_bound else None,
+        })
+    return rows
+
+
+def survey_batch(request):
+    """All professors (and the internship survey) on one page, submitted in a single POST"""
+    # Get group from session
+    group_id = request.survey_state.get('survey_group_id')
+    if not group_id:
+        return redirect('home')
+    
+    group = get_object_or_404(Group, id=group_id)
+    
+    # Get list of professors for this group (snapshot taken at flow start)
+    roster = get_group_roster(group.id)
+    professor_ids = request.survey_state.get('survey_professor_ids')
+    if professor_ids is None:
+        professor_ids = list(roster)
+        request.survey_state['survey_professor_ids'] = professor_ids
+    professors = [roster[professor_id] for professor_id in professor_ids if professor_id in roster]
+    
+    if not professors:
+        messages.warning(request, _('No professors assigned to this group.'))
+        return redirect('home')
+    
+    current_language = request.survey_state.get('survey_language', 'en')
+    data = request.POST if request.method == 'POST' else None
+    
+    catalog = get_catalog('survey')
+    questions = catalog.for_language(current_language)
+    form_class = DynamicSurveyForm.for_language(current_language, catalog)
+    
+    pages = []
+    for professor in professors:
+        prefix = f'professor_{professor.id}'
+        skipped = data is not None and f'{prefix}-skip' in data
+        form = form_class(None if skipped else data, prefix=prefix)
+        pages.append({
+            'professor': professor,
+            'prefix': prefix,
+            'skipped': skipped,
+            'form': form,
+        })
+    
+    # Semester 2-8 students also evaluate their internship
+    internship_catalog = None
+    internship_form = None
+    if group.semester > 1:
+        internship_catalog = get_catalog('internship')
+        internship_form = DynamicInternshipSurveyForm.for_language(current_language, internship_catalog)(
+            data, prefix='internship'
+        )
+    
+    if request.method == 'POST':
+        evaluated = [page for page in pages if not page['skipped']]
+        valid = all([page['form'].is_valid() for page in evaluated])
+        if internship_form is not None and not internship_form.is_valid():
+            valid = False
+        
+        if valid:
+            if evaluated or internship_form is not None:
+                # Retried POSTs reuse the same tokens and are ignored on insert
+                save_batch_submission(
+                    group,
+                    [
+                        (page['professor'], page['form'].cleaned_data,
+                         _submission_token(request, f'survey:{page["professor"].id}'))
+                        for page in evaluated
+                    ],
+                    catalog.question_map,
+                    internship_data=internship_form.cleaned_data if internship_form is not None else None,
+                    internship_question_map=internship_catalog.question_map if internship_catalog else None,
+                    internship_token=_submission_token(request, 'internship')
+                )
+            
+            # Clear session data
+            request.survey_state.pop('survey_group_id', None)
+            request.survey_state.pop('survey_professor_index', None)
+            request.survey_state.pop('survey_professor_ids', None)
+            
+            return redirect('thank_you')
+    
+    for page in pages:
+        page['questions'] = _question_rows(questions, page['form'])
+    
+    context = {
+        'group': group,
+        'pages': pages,
+        'total_professors': len(pages),
+        'internship_questions': (
+            _question_rows(internship_catalog.for_language(current_language), internship_form)
+            if internship_form is not None else None
+        ),
+        'rating_choices': Answer.RATING_CHOICES,
+    }
+    
+    return render(request, 'evaluations/survey_batch.html', context)
+
+
 def thank_you(request):
     """Thank you page after completing survey"""
     # Clear any remaining session data
-    request.session.pop('survey_group_id', None)
-    request.session.pop('survey_professor_index', None)
-    request.session.pop('survey_language', None)
+    request.survey_state.pop('survey_group_id', None)
+    request.survey_state.pop('survey_professor_index', None)
+    request.survey_state.pop('survey_professor_ids', None)
+    request.survey_state.pop('survey_language', None)
+    request.survey_state.pop('survey_flow_id', None)
     
     return render(request, 'evaluations/thank_you.html')
 
@@ -199,7 +321,7 @@ def edit_survey(request, survey_id):
 def internship_survey(request):
     """Internship evaluation survey (for semester 2-8 students only)"""
     # Get group from session
-    group_id = request.session.get('survey_group_id')
+    group_id = request.survey_state.get('survey_group_id')
     if not group_id:
         return redirect('home')
     
@@ -211,63 +333,38 @@ def internship_survey(request):
         return redirect('thank_you')
     
     # Get language from session (set during group selection)
-    current_language = request.session.get('survey_language', 'en')
+    current_language = request.survey_state.get('survey_language', 'en')
     
     # Get all active internship questions with localized text
-    questions_qs = InternshipQuestion.objects.filter(is_active=True).order_by('order')
-    questions = []
-    for q in questions_qs:
-        questions.append({
-            'id': q.id,
-            'question_type': q.question_type,
-            'order': q.order,
-            'get_text': q.get_text(current_language)
-        })
+    catalog = get_catalog('internship')
+    questions = catalog.for_language(current_language)
+    
+    submission_token = _submission_token(request, 'internship')
     
     # Handle form submission
     if request.method == 'POST':
-        form = DynamicInternshipSurveyForm(request.POST, language=current_language)
+        if request.POST.get('submission_token') != str(submission_token):
+            return redirect('internship_survey')
+        
+        form = DynamicInternshipSurveyForm.for_language(current_language, catalog)(request.POST)
         if form.is_valid():
-            # Create internship survey session
-            internship_survey = InternshipSurvey.objects.create(
-                group=group
+            # Save survey, answers and participation count in one transaction
+            save_internship_submission(
+                group, form.cleaned_data, form.question_map, submission_token=submission_token
             )
             
-            # Save all answers
-            for field_name, value in form.cleaned_data.items():
-                if field_name.startswith('question_'):
-                    question_id = int(field_name.split('_')[1])
-                    question = InternshipQuestion.objects.get(id=question_id)
-                    
-                    if question.question_type == 'rating':
-                        InternshipAnswer.objects.create(
-                            internship_survey=internship_survey,
-                            question=question,
-                            rating_value=int(value)
-                        )
-                    else:
-                        InternshipAnswer.objects.create(
-                            internship_survey=internship_survey,
-                            question=question,
-                            text_value=value
-                        )
-            
-            # Now increment participated students count
-            with transaction.atomic():
-                group.participated_students += 1
-                group.save()
-            
             # Clear session data
-            request.session.pop('survey_group_id', None)
+            request.survey_state.pop('survey_group_id', None)
             
             return redirect('thank_you')
     else:
-        form = DynamicInternshipSurveyForm(language=current_language)
+        form = DynamicInternshipSurveyForm.for_language(current_language, catalog)()
     
     context = {
         'form': form,
         'group': group,
         'questions': questions,
+        'submission_token': submission_token,
     }
     
     return render(request, 'evaluations/internship_survey.html', context)